@@ -0,0 +1,7 @@
+"""2048 solver: bitboard engine, expectimax solver, screen vision and device control.
+
+Subpackages are not imported here, so `import ai2048.engine.bitboard` loads
+only the engine and the solver never pulls in OpenCV or Tesseract.
+"""
+
+__version__ = '1.3.0'
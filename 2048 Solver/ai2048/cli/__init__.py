@@ -0,0 +1,51 @@
+"""Command line entry point: `ai2048 <command> ...` or `python -m ai2048 <command> ...`.
+
+Each command lives in its own module with a main(argv) and is only imported
+when it runs, so `ai2048 simulate` never loads OpenCV and `ai2048 --help`
+loads nothing at all.
+"""
+import importlib
+import sys
+
+# command -> (module, one-line help)
+COMMANDS = {
+    'play': ('ai2048.cli.autoplay', "Play on a phone over ADB, reading tiles by colour"),
+    'play-ocr': ('ai2048.cli.autoplay_ocr', "Play on a phone over ADB, reading tiles with Tesseract"),
+    'fleet': ('ai2048.device.fleet', "Play on several devices with one shared solver pool"),
+    'simulate': ('ai2048.cli.simulate', "Headless self-play benchmark for the solver"),
+    'bench': ('ai2048.cli.benchmark', "Offline micro/macro benchmarks with regression checks"),
+    'trace': ('ai2048.device.game_trace', "Inspect and replay game traces"),
+    'train': ('ai2048.solver.ntuple', "Train an n-tuple network evaluator by TD(0) self-play"),
+    'book': ('ai2048.cli.build_move_book', "Build a move book from self-play positions"),
+    'calibrate': ('ai2048.vision.auto_calibration', "Learn tile colours from recorded frames"),
+    'calibrate-manual': ('ai2048.cli.color_calibration', "Label tile colours by hand from screenshots"),
+    'crop': ('ai2048.cli.crop_find', "Find the board crop on a phone screenshot"),
+    'extract': ('ai2048.cli.extract_board', "Read a board from one screenshot with OCR and suggest a move"),
+    'manual': ('ai2048.cli.play_game', "Play 2048 in the terminal with WASD"),
+}
+
+
+def usage():
+    width = max(map(len, COMMANDS))
+    lines = ["usage: ai2048 <command> [options]", "", "commands:"]
+    lines += [f"  {name:<{width}}  {text}" for name, (_, text) in COMMANDS.items()]
+    lines += ["", "Run `ai2048 <command> --help` for the options of one command."]
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not argv or argv[0] in ('-h', '--help'):
+        print(usage())
+        return 0
+    if argv[0] == '--version':
+        from ai2048 import __version__
+        print(__version__)
+        return 0
+    entry = COMMANDS.get(argv[0])
+    if entry is None:
+        print(f"ai2048: unknown command {argv[0]!r}\n\n{usage()}", file=sys.stderr)
+        return 2
+    module = importlib.import_module(entry[0])
+    sys.argv[0] = f"ai2048 {argv[0]}"
+    return module.main(argv[1:])
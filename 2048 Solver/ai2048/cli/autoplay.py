@@ -0,0 +1,225 @@
+import argparse
+import asyncio
+import logging
+import os
+import subprocess
+import time
+
+import numpy as np
+
+from ai2048 import config as settings
+from ai2048 import instrumentation
+from ai2048.solver.ai_solver import search, load_evaluator, load_move_book
+from ai2048.instrumentation import timer
+
+log = logging.getLogger("autoplay")
+
+# --- Colour autoplay ---
+# Captures the phone screen over ADB, reads the tiles by colour, searches for
+# the best move and swipes it. Every setting (ADB path, crop, calibrated
+# REFERENCE_COLORS, threshold, time budget, ...) comes from ai2048.config:
+# edit an ai2048.toml next to where you run it, set AI2048_<KEY> variables or
+# pass --set KEY=VALUE. See config.DEFAULTS for the full list.
+#
+# The device and vision modules (and with them OpenCV) are imported when an
+# Autoplay is created, not when this module is.
+
+ROWS, COLS = 4, 4
+
+
+class Autoplay:
+    """One autoplay session: capture device, recognizer, tracker and trace."""
+
+    def __init__(self, config):
+        from ai2048.vision.board_recognition import ColorBoardRecognizer, LutBoardRecognizer
+        from ai2048.vision.board_tracker import BoardTracker
+
+        self.config = config
+        self.capture_device = None
+        self.trace = None
+        self.profile_first_move = config['profile_first_move']
+        self.search_workers = config['search_workers'] or os.cpu_count() or 1
+        self.internal_board = np.zeros((ROWS, COLS), dtype=int)
+        self.before_swipe = None  # Tile colours of the board the last swipe was played on
+
+        lut_path = config['color_lut_path']
+        if lut_path and os.path.exists(lut_path):
+            self.recognizer = LutBoardRecognizer.load(lut_path, samples=config['tile_color_samples'])
+        else:
+            self.recognizer = ColorBoardRecognizer(config['reference_colors'], config['color_match_threshold'],
+                                                   samples=config['tile_color_samples'])
+        self.tracker = BoardTracker(self.recognizer)
+
+    def capture_board_image(self):
+        """Grabs the current screen from the Android device as a BGR image."""
+        if self.capture_device is None:
+            from ai2048.device.capture import make_capture
+            from ai2048.vision.board_locator import BoardCapture, BoardLocator
+
+            if self.config['capture_backend'] == 'replay':
+                self.capture_device = make_capture('replay', frame_dir=self.config['replay_dir'])
+            else:
+                self.capture_device = make_capture(self.config['capture_backend'], adb_path=self.config['adb_path'])
+            if self.config['auto_locate_board']:
+                # Frames from here on are just the board
+                self.capture_device = BoardCapture(self.capture_device,
+                                                   BoardLocator(self.config['board_geometry_cache']))
+        img = self.capture_device.capture()
+        if img is None:
+            log.error("❌ Image not loaded. Ensure ADB is connected and the device screen is on.")
+        return img
+
+    def capture_settled(self):
+        """capture_board_image once the last swipe's animation has finished.
+
+        Polls like the pipelined loop does: until two consecutive frames have
+        the same coarse tile colours and differ from the board before the
+        swipe, or SETTLE_TIMEOUT passes. Replayed frames are already settled.
+        """
+        from ai2048.device.pipeline import POLL_INTERVAL, SETTLE_TIMEOUT
+
+        before, self.before_swipe = self.before_swipe, None
+        img = self.capture_board_image()
+        if before is None or img is None or self.config['capture_backend'] == 'replay':
+            return img
+        deadline = time.monotonic() + SETTLE_TIMEOUT
+        last = None
+        while True:
+            signature = self.recognizer.tile_colors(self.board_region(img), samples=4)
+            settled = last is not None and np.array_equal(signature, last)
+            if (settled and not np.array_equal(signature, before)) or time.monotonic() > deadline:
+                return img
+            last = signature
+            time.sleep(POLL_INTERVAL)
+            img = self.capture_board_image()
+            if img is None:
+                return None
+
+    def board_region(self, img):
+        """The board part of a captured image."""
+        if self.config['auto_locate_board']:
+            return img
+        y1, y2, x1, x2 = self.config['crop']
+        return img[y1:y2, x1:x2]
+
+    def swipe(self, direction):
+        """Performs a swipe action on the Android device using ADB."""
+        swipes = self.config['swipes']
+        if direction.lower() in swipes:
+            x1_s, y1_s, x2_s, y2_s = swipes[direction.lower()]
+            subprocess.run([self.config['adb_path'], 'shell', 'input', 'swipe',
+                            str(x1_s), str(y1_s), str(x2_s), str(y2_s), str(self.config['swipe_ms'])])
+            log.debug(f"✅ Swiped {direction}")
+        else:
+            log.error("❌ Invalid swipe direction.")
+
+    def step(self):
+        """One turn: capture, read, search, swipe. Returns False when play should stop."""
+        log.debug("\U0001F4F8 Capturing screenshot...")
+        start = time.perf_counter()
+        with timer("capture"):
+            img = self.capture_settled()
+        timings = {'capture': (time.perf_counter() - start) * 1000.0}
+        if img is None:
+            log.error("Stopping due to image capture failure.")
+            return False
+
+        log.debug("\U0001F9E0 Reading board from screen...")
+        # Confirms the board predicted after the last swipe; falls back to a full read on mismatch
+        start = time.perf_counter()
+        with timer("recognize"):
+            scanned_board = self.tracker.observe(self.board_region(img))
+        timings['recognize'] = (time.perf_counter() - start) * 1000.0
+        self.internal_board = scanned_board
+        log.debug(f"Scanned Board:\n{scanned_board}")
+
+        budget = self.config['move_time_budget_ms']
+        start = time.perf_counter()
+        if self.profile_first_move:
+            self.profile_first_move = False
+            result = instrumentation.profile_call(search, scanned_board, workers=1, time_budget_ms=budget)
+        else:
+            result = search(scanned_board, workers=self.search_workers, time_budget_ms=budget)
+        timings['search'] = (time.perf_counter() - start) * 1000.0
+        move = result['move']
+
+        if move:
+            move = move.upper()
+            log.info(f"\U0001F916 Best Move: {move}")
+            self.before_swipe = self.recognizer.tile_colors(self.board_region(img), samples=4)
+            start = time.perf_counter()
+            with timer("swipe"):
+                self.swipe(move)
+            timings['swipe'] = (time.perf_counter() - start) * 1000.0
+            # The next capture only has to confirm this prediction and find the new tile
+            self.tracker.predict(move)
+        else:
+            log.warning("❌ No valid moves found by AI. Game likely over or stuck. Stopping.")
+
+        if self.trace is not None:
+            self.trace.record(scanned_board, result['move'], result, timings,
+                              self.board_region(img) if self.config['trace_roi'] else None)
+
+        if instrumentation.ENABLED and self.config['metrics_path']:
+            with open(self.config['metrics_path'], "a") as f:
+                instrumentation.write_json_line(f, move=move)
+        return move is not None
+
+    def run_pipelined(self):
+        """Plays with the asyncio pipeline and prints per-stage latency when it stops."""
+        from ai2048.device.pipeline import AutoplayPipeline
+
+        self.capture_board_image()  # Opens the capture device
+        crop = None if self.config['auto_locate_board'] else tuple(self.config['crop'])
+        runner = AutoplayPipeline(self.capture_device, self.tracker, crop, self.config['swipes'],
+                                  [self.config['adb_path']], search_workers=self.search_workers,
+                                  time_budget_ms=self.config['move_time_budget_ms'],
+                                  swipe_ms=self.config['swipe_ms'], trace=self.trace,
+                                  trace_roi=self.config['trace_roi'])
+        try:
+            asyncio.run(runner.run())
+        except KeyboardInterrupt:
+            pass
+        print("\U0001F4CA Pipeline stats:")
+        print(runner.stats())
+
+    def run(self):
+        """Plays until the game ends, capture fails or Ctrl+C."""
+        config = self.config
+        if config['metrics']:
+            instrumentation.enable()
+        if config['move_book_path']:
+            load_move_book(config['move_book_path'])
+        if config['evaluator_path']:
+            load_evaluator(config['evaluator_path'])
+        if config['trace_path']:
+            from ai2048.device.game_trace import TraceWriter
+            self.trace = TraceWriter(config['trace_path'])
+        print("Starting 2048 AI Autoplay...")
+        try:
+            if config['pipelined']:
+                self.run_pipelined()
+            else:
+                while self.step():
+                    pass
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if self.trace is not None:
+                self.trace.close()
+            if self.capture_device is not None:
+                self.capture_device.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play 2048 on an Android phone over ADB, reading tiles by colour.")
+    settings.add_config_arguments(parser)
+    args = parser.parse_args(argv)
+    config = settings.from_args(args)
+
+    logging.basicConfig(level=config['log_level'], format="%(message)s")
+    Autoplay(config).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import argparse
+import logging
+import subprocess
+import time
+
+import numpy as np
+
+from ai2048 import config as settings
+from ai2048.solver.ai_solver import best_move
+from ai2048.instrumentation import timer
+
+log = logging.getLogger("autoplay")
+
+# --- OCR autoplay ---
+# The original Tesseract-based player. ADB and Tesseract paths, the fallback
+# crop, swipes and OCR mode come from ai2048.config (tesseract_cmd, ocr_*),
+# so nothing here is specific to one Windows install.
+
+VALID_TILES = np.array([0, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048])
+
+
+def closest_valid_tile(val):
+    if val in VALID_TILES:
+        return val
+    else:
+        diffs = np.abs(VALID_TILES - val)
+        return VALID_TILES[np.argmin(diffs)]
+
+
+class OcrAutoplay:
+    """Captures the screen, reads the numbers with Tesseract and swipes the best move."""
+
+    def __init__(self, config):
+        from ai2048.vision.board_locator import BoardLocator
+        from ai2048.vision.ocr_recognition import TesseractBoardReader
+
+        if config['tesseract_cmd']:
+            import pytesseract
+            pytesseract.pytesseract.tesseract_cmd = config['tesseract_cmd']
+        self.config = config
+        self.board_locator = BoardLocator(config['board_geometry_cache'])
+        self.ocr_reader = TesseractBoardReader(threshold=config['ocr_threshold'], mode=config['ocr_mode'],
+                                               dump_dir=config['debug_tile_dir'])
+
+    def swipe(self, direction):
+        swipes = self.config['ocr_swipes']
+        if direction not in swipes:
+            log.error(f"❌ Invalid direction: {direction}")
+            return
+
+        x1, y1, x2, y2 = swipes[direction]
+        result = subprocess.run([self.config['adb_path'], 'shell', 'input', 'swipe',
+                                 str(x1), str(y1), str(x2), str(y2), '100']).returncode
+
+        if result == 0:
+            log.debug(f"✅ Swiped {direction.upper()}")
+        else:
+            log.error(f"❌ Failed to swipe {direction.upper()} — check ADB path or connection.")
+
+    def extract_board_from_image(self, image):
+        if isinstance(image, str):
+            import cv2
+            image = cv2.imread(image)
+        board_img = self.board_locator.board(image) if self.config['auto_locate_board'] else None
+        if board_img is None:
+            y1, y2, x1, x2 = self.config['ocr_crop']
+            board_img = image[y1:y2, x1:x2]  # OLD crop size
+
+        numbers = self.ocr_reader.read(board_img)
+        board = [[closest_valid_tile(num) if num is not None else 0 for num in row] for row in numbers]
+        return np.array(board)
+
+    def run(self):
+        from ai2048.device.capture import make_capture
+
+        capture_device = make_capture(self.config['capture_backend'], adb_path=self.config['adb_path'])
+        try:
+            while True:
+                log.debug("\n📸 Capturing screenshot...")
+                with timer("capture"):
+                    image = capture_device.capture()
+                if image is None:
+                    log.error("❌ Screenshot failed. Stopping.")
+                    break
+
+                with timer("recognize"):
+                    board = self.extract_board_from_image(image)
+                log.debug(f"🧠 Extracted Board:\n{board}")
+
+                move = best_move(board, time_budget_ms=self.config['move_time_budget_ms'])
+                if move:
+                    log.info(f"🤖 Best Move: {move.upper()}")
+                    with timer("swipe"):
+                        self.swipe(move)
+                else:
+                    log.warning("❌ No valid moves. Stopping.")
+                    break
+
+                time.sleep(1.5)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            capture_device.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play 2048 on an Android phone over ADB, reading tiles with Tesseract.")
+    settings.add_config_arguments(parser)
+    args = parser.parse_args(argv)
+    config = settings.from_args(args)
+
+    logging.basicConfig(level=config['log_level'], format="%(message)s")
+    OcrAutoplay(config).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,390 @@
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from ai2048.solver import ai_solver
+from ai2048.engine import batch_game
+from ai2048.engine import game_logic
+from ai2048.solver import heuristic
+from ai2048.cli import simulate
+from ai2048.vision.auto_calibration import compile_lut
+from ai2048.engine.bitboard import board_to_bitboard, bitboard_to_board, all_moves, execute_move, empty_cells, spawn_random_tile
+from ai2048.vision.board_recognition import ColorBoardRecognizer, LutBoardRecognizer
+from ai2048.device.fleet import DEFAULT_PROFILE, render_board
+
+# --- Benchmark suite ---
+# Offline, reproducible timings of the hot paths, against a fixed corpus:
+#   micro: moves/sec (game_logic, bitboard, batch_game), evals/sec
+#          (heuristic, optionally an n-tuple network), tiles classified/sec
+#          (colour and LUT recognizers, Tesseract OCR when installed) and
+#          search nodes/sec
+#   macro: ms per decision at a fixed depth and seeded self-play games/min
+# Every result is best-of-REPEATS, so background noise inflates it less.
+# `run` writes them to JSON; `compare` flags results that got worse than a
+# saved baseline by more than a threshold and exits non-zero.
+#
+# The corpus lives in bench_corpus/: boards.json holds boards at every fill
+# level from seeded self-play, screens/ board images rendered in the shipping
+# calibration colours with their boards in screens.json. Recorded device
+# screenshots can be added there the same way. `corpus` regenerates both.
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'bench_corpus')
+# Empty-cell counts the corpus samples boards at
+CORPUS_FILL_LEVELS = (14, 12, 10, 8, 6, 4, 3, 2, 1, 0)
+CORPUS_GAMES = 4
+CORPUS_SEED = 2048
+# Boards rendered as screenshots (their tiles must be in the calibration)
+CORPUS_SCREENS = 12
+
+REPEATS = 5
+SEARCH_DEPTH = 2
+DECISION_DEPTH = 3
+SELF_PLAY_GAMES = 4
+SELF_PLAY_DEPTH = 2
+SELF_PLAY_MOVES = 300
+# Relative slowdown compare reports as a regression
+REGRESSION_THRESHOLD = 0.10
+
+GAME_LOGIC_MOVES = (game_logic.move_up, game_logic.move_down, game_logic.move_left, game_logic.move_right)
+
+
+# --- Corpus ---
+
+def build_corpus(seed=CORPUS_SEED, games=CORPUS_GAMES):
+    """Boards from seeded depth-2 self-play, the first one at each fill level per game."""
+    boards = []
+    for g in range(games):
+        rng = random.Random(seed + g)
+        ai_solver.TRANSPOSITION_TABLE.clear()
+        bb = spawn_random_tile(spawn_random_tile(0, rng), rng)
+        wanted = set(CORPUS_FILL_LEVELS)
+        moves = 0
+        while wanted:
+            empty = len(empty_cells(bb))
+            if empty in wanted:
+                wanted.discard(empty)
+                boards.append({'name': f"g{g}-m{moves}-e{empty}", 'empty': empty,
+                               'board': bitboard_to_board(bb).tolist()})
+            move = ai_solver.best_move(bb, depth=SELF_PLAY_DEPTH, workers=1)
+            if move is None:
+                break
+            bb, _ = execute_move(bb, move)
+            bb = spawn_random_tile(bb, rng)
+            moves += 1
+    return boards
+
+
+def write_corpus(corpus_dir=CORPUS_DIR):
+    boards = build_corpus()
+    os.makedirs(os.path.join(corpus_dir, 'screens'), exist_ok=True)
+    with open(os.path.join(corpus_dir, 'boards.json'), 'w') as f:
+        json.dump(boards, f, indent=1)
+
+    palette = {value: np.array(color, dtype=np.uint8) for value, color in DEFAULT_PROFILE['reference_colors'].items()}
+    drawable = [b for b in boards if max(map(max, b['board'])) <= max(palette)]
+    picked = drawable[::max(len(drawable) // CORPUS_SCREENS, 1)][:CORPUS_SCREENS]
+    screens = {}
+    for entry in picked:
+        name = f"{entry['name']}.png"
+        cv2.imwrite(os.path.join(corpus_dir, 'screens', name),
+                    render_board(board_to_bitboard(np.array(entry['board'])), palette))
+        screens[name] = entry['board']
+    with open(os.path.join(corpus_dir, 'screens.json'), 'w') as f:
+        json.dump(screens, f, indent=1)
+    return len(boards), len(screens)
+
+
+def load_corpus(corpus_dir=CORPUS_DIR):
+    """(boards as 4x4 arrays, [(screenshot, expected board)])."""
+    with open(os.path.join(corpus_dir, 'boards.json')) as f:
+        boards = [np.array(entry['board'], dtype=np.int64) for entry in json.load(f)]
+    with open(os.path.join(corpus_dir, 'screens.json')) as f:
+        screens = [(cv2.imread(os.path.join(corpus_dir, 'screens', name)), np.array(board))
+                   for name, board in json.load(f).items()]
+    return boards, screens
+
+
+# --- Timing ---
+
+def best_of(fn, repeats=REPEATS):
+    """Fastest of repeats calls of fn, in seconds."""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def rate(count, seconds, unit):
+    return {'value': count / seconds, 'unit': unit, 'higher_is_better': True}
+
+
+def latency(ms, unit='ms'):
+    return {'value': ms, 'unit': unit, 'higher_is_better': False}
+
+
+# --- Micro benchmarks ---
+
+def bench_game_logic_moves(boards, screens, repeats):
+    def run():
+        for board in boards:
+            for move in GAME_LOGIC_MOVES:
+                move(board)
+    return rate(4 * len(boards), best_of(run, repeats), 'moves/s')
+
+
+def bench_bitboard_moves(boards, screens, repeats):
+    bbs = [board_to_bitboard(b) for b in boards] * 20
+
+    def run():
+        for bb in bbs:
+            for _ in all_moves(bb):
+                pass
+    return rate(4 * len(bbs), best_of(run, repeats), 'moves/s')
+
+
+def bench_batch_moves(boards, screens, repeats):
+    bbs = np.array([board_to_bitboard(b) for b in boards] * 200, dtype=np.uint64)
+    return rate(4 * len(bbs), best_of(lambda: batch_game.all_moves(bbs), repeats), 'moves/s')
+
+
+def bench_heuristic_evals(boards, screens, repeats):
+    bbs = [board_to_bitboard(b) for b in boards] * 50
+    heuristic.line_table()
+
+    def run():
+        for bb in bbs:
+            heuristic.evaluate_board(bb)
+    return rate(len(bbs), best_of(run, repeats), 'evals/s')
+
+
+def bench_heuristic_batch_evals(boards, screens, repeats):
+    bbs = np.array([board_to_bitboard(b) for b in boards] * 200, dtype=np.uint64)
+    heuristic.line_table()
+    return rate(len(bbs), best_of(lambda: heuristic.evaluate_boards(bbs), repeats), 'evals/s')
+
+
+def bench_color_recognition(boards, screens, repeats):
+    recognizer = ColorBoardRecognizer(DEFAULT_PROFILE['reference_colors'], DEFAULT_PROFILE['threshold'])
+    return _recognition(recognizer, screens, repeats)
+
+
+def bench_lut_recognition(boards, screens, repeats):
+    items = sorted(DEFAULT_PROFILE['reference_colors'].items())
+    centres = np.array([color for _, color in items], dtype=np.float64)
+    lut = compile_lut(centres, {i: value for i, (value, _) in enumerate(items)})
+    return _recognition(LutBoardRecognizer(lut), screens, repeats)
+
+
+def _recognition(recognizer, screens, repeats):
+    for image, expected in screens:
+        board, _, _ = recognizer.read(image)
+        if not np.array_equal(board, expected):
+            raise RuntimeError(f"{type(recognizer).__name__} misread a corpus screenshot:\n{board}")
+    images = [image for image, _ in screens] * 10
+
+    def run():
+        for image in images:
+            recognizer.read(image)
+    return rate(16 * len(images), best_of(run, repeats), 'tiles/s')
+
+
+def bench_ocr_recognition(boards, screens, repeats):
+    """Tesseract path of autoplay_ocr.py / extract_board.py; skipped without Tesseract."""
+    try:
+        from ai2048.vision.ocr_recognition import TesseractBoardReader
+        import pytesseract
+        pytesseract.get_tesseract_version()
+    except Exception as e:
+        return {'skipped': f"Tesseract unavailable ({type(e).__name__})"}
+    reader = TesseractBoardReader(cache_size=0)
+    images = [image for image, _ in screens]
+
+    def run():
+        for image in images:
+            reader.read(image)
+    try:
+        return rate(16 * len(images), best_of(run, max(repeats // 2, 1)), 'tiles/s')
+    finally:
+        reader.close()
+
+
+def bench_search_nodes(boards, screens, repeats):
+    bbs = [board_to_bitboard(b) for b in boards]
+    nodes = []
+
+    def run():
+        before = ai_solver.nodes_expanded
+        for bb in bbs:
+            ai_solver.TRANSPOSITION_TABLE.clear()
+            ai_solver.score_moves(bb, SEARCH_DEPTH)
+        nodes.append(ai_solver.nodes_expanded - before)
+    seconds = best_of(run, repeats)
+    return rate(nodes[-1], seconds, 'nodes/s')
+
+
+def bench_ntuple_evals(boards, screens, repeats, evaluator=None):
+    if not evaluator:
+        return {'skipped': "no --evaluator checkpoint given"}
+    from ai2048.solver.ntuple import NTupleNetwork
+    network = NTupleNetwork.load(evaluator)
+    bbs = [board_to_bitboard(b) for b in boards] * 20
+
+    def run():
+        for bb in bbs:
+            network.evaluate_board(bb)
+    return rate(len(bbs), best_of(run, repeats), 'evals/s')
+
+
+# --- Macro benchmarks ---
+
+def bench_decision_ms(boards, screens, repeats):
+    """Mean ms for one cold best_move at DECISION_DEPTH over the corpus."""
+    bbs = [board_to_bitboard(b) for b in boards]
+
+    def run():
+        for bb in bbs:
+            ai_solver.TRANSPOSITION_TABLE.clear()
+            ai_solver.best_move(bb, depth=DECISION_DEPTH, workers=1)
+    return latency(best_of(run, max(repeats // 2, 1)) / len(bbs) * 1000.0)
+
+
+def bench_self_play(boards, screens, repeats):
+    """Seeded headless games (capped at SELF_PLAY_MOVES moves) per minute."""
+    results = []
+
+    def run():
+        results[:] = simulate.run_games(SELF_PLAY_GAMES, seed=0, depth=SELF_PLAY_DEPTH,
+                                        max_moves=SELF_PLAY_MOVES)
+    seconds = best_of(run, max(repeats // 2, 1))
+    result = rate(SELF_PLAY_GAMES * 60.0, seconds, 'games/min')
+    # Same seeds, same games: a changed score means changed play, not noise
+    result['score'] = sum(r['score'] for r in results)
+    return result
+
+
+BENCHMARKS = {
+    'micro.game_logic_moves': bench_game_logic_moves,
+    'micro.bitboard_moves': bench_bitboard_moves,
+    'micro.batch_moves': bench_batch_moves,
+    'micro.heuristic_evals': bench_heuristic_evals,
+    'micro.heuristic_batch_evals': bench_heuristic_batch_evals,
+    'micro.ntuple_evals': bench_ntuple_evals,
+    'micro.color_recognition': bench_color_recognition,
+    'micro.lut_recognition': bench_lut_recognition,
+    'micro.ocr_recognition': bench_ocr_recognition,
+    'micro.search_nodes': bench_search_nodes,
+    'macro.decision_ms': bench_decision_ms,
+    'macro.self_play': bench_self_play,
+}
+
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'commit': commit,
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+
+def run_benchmarks(only=None, repeats=REPEATS, evaluator=None, corpus_dir=CORPUS_DIR):
+    boards, screens = load_corpus(corpus_dir)
+    results = {}
+    for name, bench in BENCHMARKS.items():
+        if only and not any(pattern in name for pattern in only):
+            continue
+        kwargs = {'evaluator': evaluator} if bench is bench_ntuple_evals else {}
+        results[name] = bench(boards, screens, repeats, **kwargs)
+        shown = results[name].get('skipped') or f"{results[name]['value']:,.1f} {results[name]['unit']}"
+        print(f"{name:<30} {shown}", file=sys.stderr)
+    return {'environment': environment(), 'results': results}
+
+
+def compare(baseline, current, threshold=REGRESSION_THRESHOLD):
+    """Rows of (name, baseline, current, change, regressed); change > 0 is better."""
+    rows = []
+    for name, new in current['results'].items():
+        old = baseline['results'].get(name)
+        if old is None or 'value' not in old or 'value' not in new:
+            continue
+        change = new['value'] / old['value'] - 1.0 if old['value'] else 0.0
+        if not new['higher_is_better']:
+            change = old['value'] / new['value'] - 1.0 if new['value'] else 0.0
+        rows.append((name, old['value'], new['value'], new['unit'], change, change < -threshold))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline micro/macro benchmarks with regression checks.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    run = commands.add_parser('run', help="Run the benchmarks and write JSON results")
+    run.add_argument('--out', help="Results file (default: stdout)")
+    run.add_argument('--only', nargs='*', help="Run only benchmarks whose name contains one of these")
+    run.add_argument('--repeats', type=int, default=REPEATS)
+    run.add_argument('--evaluator', help="n-tuple checkpoint for micro.ntuple_evals")
+    run.add_argument('--baseline', help="Compare against this results file afterwards")
+    run.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD)
+    cmp = commands.add_parser('compare', help="Flag regressions between two results files")
+    cmp.add_argument('baseline')
+    cmp.add_argument('current')
+    cmp.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                     help="Relative slowdown that counts as a regression (0.1 = 10%%)")
+    commands.add_parser('corpus', help="Regenerate bench_corpus/ from seeded self-play")
+    args = parser.parse_args(argv)
+
+    if args.command == 'corpus':
+        boards, screens = write_corpus()
+        print(f"Wrote {boards} boards and {screens} screenshots to {CORPUS_DIR}")
+        return
+
+    if args.command == 'run':
+        current = run_benchmarks(args.only, args.repeats, args.evaluator)
+        if args.out:
+            with open(args.out, 'w') as f:
+                json.dump(current, f, indent=2)
+        else:
+            print(json.dumps(current, indent=2))
+        if not args.baseline:
+            return
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    else:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        with open(args.current) as f:
+            current = json.load(f)
+
+    rows = compare(baseline, current, args.threshold)
+    for name, old, new, unit, change, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{name:<30} {old:>14,.1f} -> {new:>14,.1f} {unit:<10} {change:+7.1%}{flag}")
+    for name, new in current['results'].items():
+        old = baseline['results'].get(name, {})
+        if 'score' in new and 'score' in old and new['score'] != old['score']:
+            print(f"⚠️ {name}: seeded games scored {new['score']} instead of {old['score']}; the solver plays differently")
+    regressions = [row[0] for row in rows if row[5]]
+    if regressions:
+        print(f"❌ {len(regressions)} regression(s) beyond {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+    print(f"✅ No regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import argparse
+import random
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from ai2048.solver import ai_solver
+from ai2048.engine.bitboard import MOVES, execute_move, spawn_random_tile, count_empty, canonical_board
+from ai2048.solver.move_book import MoveBook, write_book
+
+# --- Offline move book builder ---
+# Plays seeded self-play games at a cheap depth to find the positions that
+# actually come up (the opening, and tight boards with few empty cells),
+# then solves each distinct canonical position at a high depth and writes
+# the results as a move book for ai_solver.load_move_book.
+
+
+def collect_positions(games, seed=0, depth=2, opening_moves=20, tight_empty=2):
+    """Counts canonical boards seen in the opening or with few empty cells."""
+    seen = Counter()
+    for game in range(games):
+        rng = random.Random(seed + game)
+        ai_solver.TRANSPOSITION_TABLE.clear()
+        bb = spawn_random_tile(spawn_random_tile(0, rng), rng)
+        moves = 0
+        while True:
+            if moves < opening_moves or count_empty(bb) <= tight_empty:
+                seen[canonical_board(bb)] += 1
+            move = ai_solver.best_move(bb, depth=depth, workers=1)
+            if move is None:
+                break
+            bb = spawn_random_tile(execute_move(bb, move)[0], rng)
+            moves += 1
+    return seen
+
+
+def solve_position(bb, depth):
+    """(direction, value) of the best move at a fixed depth, or None if stuck."""
+    scores = ai_solver.score_moves(bb, depth)
+    if not scores:
+        return None
+    move = max(scores, key=scores.get)
+    return move, scores[move]
+
+
+def _solve_args(args):
+    return args[0], solve_position(*args)
+
+
+def solve_positions(positions, depth, workers=1):
+    """Returns {bb: (direction, value, depth)} for every solvable position."""
+    jobs = [(bb, depth) for bb in positions]
+    if workers <= 1:
+        results = map(_solve_args, jobs)
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        results = executor.map(_solve_args, jobs, chunksize=16)
+    entries = {bb: (solved[0], solved[1], depth) for bb, solved in results if solved is not None}
+    if workers > 1:
+        executor.shutdown()
+    return entries
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build a 2048 move book from self-play positions.")
+    parser.add_argument('output', help="Book file to write")
+    parser.add_argument('--games', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--play-depth', type=int, default=2, help="Depth used to play the collection games")
+    parser.add_argument('--depth', type=int, default=5, help="Depth used to solve book positions")
+    parser.add_argument('--opening-moves', type=int, default=20,
+                        help="Record every position in the first N moves of a game")
+    parser.add_argument('--tight-empty', type=int, default=2,
+                        help="Record every position with at most this many empty cells")
+    parser.add_argument('--min-count', type=int, default=1,
+                        help="Only solve positions seen at least this many times")
+    parser.add_argument('--merge', help="Existing book whose entries are kept unless re-solved")
+    parser.add_argument('--workers', type=int, default=1)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    seen = collect_positions(args.games, args.seed, args.play_depth, args.opening_moves, args.tight_empty)
+    positions = [bb for bb, n in seen.items() if n >= args.min_count]
+    print(f"Collected {len(seen)} distinct positions in {time.perf_counter() - start:.1f}s, "
+          f"solving {len(positions)} at depth {args.depth}")
+
+    entries = {}
+    if args.merge:
+        with MoveBook(args.merge) as old:
+            for record in old.records:
+                entries[int(record['key'])] = (MOVES[record['move']], float(record['value']),
+                                               int(record['depth']))
+
+    start = time.perf_counter()
+    entries.update(solve_positions(positions, args.depth, args.workers))
+    count = write_book(args.output, entries)
+    print(f"Wrote {count} entries to {args.output} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,31 @@
-﻿import cv2
-import os
+import argparse
+import subprocess
+
+from ai2048 import config as settings
+from ai2048.vision.board_locator import locate_board
 
-ADB_PATH = r'C:\platform-tools\adb'
 SCALE_PERCENT = 40  # Scale image down to fit screen
 
-def capture_screenshot():
+def capture_screenshot(adb_path):
     print("📸 Capturing screenshot from phone...")
-    os.system(f'"{ADB_PATH}" shell screencap -p /sdcard/screen2048.png')
-    os.system(f'"{ADB_PATH}" pull /sdcard/screen2048.png')
+    subprocess.run([adb_path, 'shell', 'screencap', '-p', '/sdcard/screen2048.png'])
+    subprocess.run([adb_path, 'pull', '/sdcard/screen2048.png'])
 
-def crop_image():
-    original = cv2.imread("screen2048.png")
+def crop_image(path="screen2048.png"):
+    import cv2
+    original = cv2.imread(path)
     if original is None:
         print("❌ Failed to load image.")
         return
 
+    geometry = locate_board(original)
+    if geometry is not None:
+        y1, y2, x1, x2 = geometry.crop
+        print("\n🔎 Board found automatically (original resolution):")
+        print(f"x1 = {x1}, x2 = {x2}")
+        print(f"y1 = {y1}, y2 = {y2}")
+        print("Drag a rectangle below to pick the region by hand instead.")
+
     # Resize image for display
     scale = SCALE_PERCENT / 100.0
     resized = cv2.resize(original, (0, 0), fx=scale, fy=scale)
@@ -60,6 +71,17 @@ def crop_image():
     cv2.waitKey(0)
     cv2.destroyAllWindows()
 
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Find the board crop on a phone screenshot.")
+    parser.add_argument('image', nargs='?', help="Use this screenshot instead of capturing one over ADB")
+    settings.add_config_arguments(parser)
+    args = parser.parse_args(argv)
+
+    if args.image:
+        crop_image(args.image)
+    else:
+        capture_screenshot(settings.from_args(args)['adb_path'])
+        crop_image()
+
 if __name__ == "__main__":
-    capture_screenshot()
-    crop_image()
+    main()
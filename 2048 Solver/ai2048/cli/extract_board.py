@@ -0,0 +1,55 @@
+import argparse
+
+import numpy as np
+
+from ai2048 import config as settings
+
+# --- One-shot OCR ---
+# Reads a board from a single screenshot with Tesseract and prints the move
+# the solver would play on it.
+
+
+def extract_board(image, crop=(155, 325, 40, 365), threshold=200):
+    """OCR all 16 tiles of a 400x400-resized screenshot in one Tesseract call."""
+    import cv2
+    from ai2048.vision.ocr_recognition import TesseractBoardReader
+
+    image = cv2.resize(image, (400, 400))  # optional
+    y1, y2, x1, x2 = crop
+    board_img = image[y1:y2, x1:x2]
+
+    reader = TesseractBoardReader(threshold=threshold)
+    numbers = reader.read(board_img)
+    detected_board = [[num if num is not None else 0 for num in row] for row in numbers]  # No number detected = empty tile
+    return np.array(detected_board)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Read a 2048 board from a screenshot with OCR and suggest a move.")
+    parser.add_argument('image', help="Screenshot to read")
+    parser.add_argument('--crop', type=int, nargs=4, metavar=('Y1', 'Y2', 'X1', 'X2'), default=None,
+                        help="Board region after resizing to 400x400 (default: ocr_crop setting)")
+    parser.add_argument('--threshold', type=int, default=200)
+    settings.add_config_arguments(parser)
+    args = parser.parse_args(argv)
+    config = settings.from_args(args)
+
+    import cv2
+    if config['tesseract_cmd']:
+        import pytesseract
+        pytesseract.pytesseract.tesseract_cmd = config['tesseract_cmd']
+    image = cv2.imread(args.image)
+    if image is None:
+        parser.error(f"Could not read {args.image}")
+
+    board_array = extract_board(image, args.crop or config['ocr_crop'], args.threshold)
+    print("\n✅ Extracted 2048 Board:")
+    print(board_array)
+
+    from ai2048.solver.ai_solver import best_move
+    move = best_move(board_array)
+    print(f"\n🤖 Best Move: {move.upper() if move else None}")
+
+
+if __name__ == "__main__":
+    main()
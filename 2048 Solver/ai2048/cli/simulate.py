@@ -0,0 +1,174 @@
+import argparse
+import csv
+import json
+import random
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from ai2048.solver import ai_solver
+from ai2048.engine.bitboard import execute_move, spawn_random_tile, max_rank
+
+# Tiles whose reach rate is reported in the summary
+REACH_TILES = (1024, 2048, 4096, 8192)
+# A game counts as won once it reaches this tile
+WIN_TILE = 2048
+
+# ai_solver pruning settings for the exhaustive search (see --compare)
+EXHAUSTIVE = {'PROB_CUTOFF': 0.0, 'SPAWN_SAMPLES': None, 'ADAPTIVE_DEPTH_OFFSET': None}
+
+
+def play_game(seed, depth=ai_solver.MAX_DEPTH, time_budget_ms=None, max_moves=None, pruning=None,
+              evaluator=None):
+    """Plays one headless game with best_move and returns its stats.
+
+    All randomness comes from random.Random(seed), so a fixed-depth game is
+    fully reproducible. A time budget makes the search depth depend on the
+    machine, and with it the game. pruning maps ai_solver pruning settings
+    (e.g. 'PROB_CUTOFF') to the values to play with, and evaluator is an
+    n-tuple checkpoint to score leaves with instead of the heuristic.
+    """
+    for name, value in (pruning or {}).items():
+        setattr(ai_solver, name, value)
+    ai_solver.load_evaluator(evaluator)
+    rng = random.Random(seed)
+    nodes_before = ai_solver.nodes_expanded
+    leaves_before = ai_solver.leaves_evaluated
+    bb = spawn_random_tile(spawn_random_tile(0, rng), rng)
+    score = 0
+    decision_ms = []
+    start = time.perf_counter()
+
+    while max_moves is None or len(decision_ms) < max_moves:
+        t = time.perf_counter()
+        move = ai_solver.best_move(bb, depth=depth, workers=1, time_budget_ms=time_budget_ms)
+        decision_ms.append((time.perf_counter() - t) * 1000.0)
+        if move is None:
+            decision_ms.pop()
+            break
+        bb, gained = execute_move(bb, move)
+        score += gained
+        bb = spawn_random_tile(bb, rng)
+
+    return {
+        'seed': seed,
+        'moves': len(decision_ms),
+        'score': score,
+        'max_tile': 1 << max_rank(bb),
+        'duration_s': time.perf_counter() - start,
+        'decision_ms': decision_ms,
+        'nodes': ai_solver.nodes_expanded - nodes_before,
+        'leaves': ai_solver.leaves_evaluated - leaves_before,
+    }
+
+
+def _play_game_args(args):
+    return play_game(*args)
+
+
+def run_games(games, seed=0, workers=1, depth=ai_solver.MAX_DEPTH, time_budget_ms=None, max_moves=None,
+              pruning=None, evaluator=None):
+    """Plays games seeded seed, seed+1, ... across a process pool."""
+    jobs = [(seed + i, depth, time_budget_ms, max_moves, pruning, evaluator) for i in range(games)]
+    if workers <= 1:
+        return [_play_game_args(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_play_game_args, jobs))
+
+
+def summarize(results, wall_time_s):
+    decisions = np.array([ms for r in results for ms in r['decision_ms']], dtype=np.float64)
+    scores = np.array([r['score'] for r in results], dtype=np.float64)
+    max_tiles = Counter(r['max_tile'] for r in results)
+    total_moves = int(sum(r['moves'] for r in results))
+    n = len(results)
+
+    return {
+        'games': n,
+        'total_moves': total_moves,
+        'wall_time_s': wall_time_s,
+        'moves_per_sec': total_moves / wall_time_s if wall_time_s else 0.0,
+        'nodes_per_move': sum(r['nodes'] for r in results) / total_moves if total_moves else 0.0,
+        'leaves_per_move': sum(r['leaves'] for r in results) / total_moves if total_moves else 0.0,
+        'win_rate': sum(1 for r in results if r['max_tile'] >= WIN_TILE) / n if n else 0.0,
+        'decision_ms': {
+            'p50': float(np.percentile(decisions, 50)) if decisions.size else 0.0,
+            'p95': float(np.percentile(decisions, 95)) if decisions.size else 0.0,
+            'p99': float(np.percentile(decisions, 99)) if decisions.size else 0.0,
+            'mean': float(decisions.mean()) if decisions.size else 0.0,
+        },
+        'max_tile_distribution': {str(tile): max_tiles[tile] for tile in sorted(max_tiles)},
+        'reach_rate': {str(tile): sum(1 for r in results if r['max_tile'] >= tile) / n if n else 0.0
+                       for tile in REACH_TILES},
+        'score': {
+            'mean': float(scores.mean()) if n else 0.0,
+            'median': float(np.median(scores)) if n else 0.0,
+            'min': float(scores.min()) if n else 0.0,
+            'max': float(scores.max()) if n else 0.0,
+        },
+    }
+
+
+def write_csv(results, path):
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['seed', 'moves', 'score', 'max_tile', 'duration_s', 'mean_decision_ms'])
+        for r in results:
+            mean_ms = sum(r['decision_ms']) / len(r['decision_ms']) if r['decision_ms'] else 0.0
+            writer.writerow([r['seed'], r['moves'], r['score'], r['max_tile'],
+                             f"{r['duration_s']:.3f}", f"{mean_ms:.3f}"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless 2048 self-play benchmark for the AI solver.")
+    parser.add_argument('--games', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=0, help="Seed of the first game; game i uses seed + i")
+    parser.add_argument('--workers', type=int, default=1, help="Games played in parallel")
+    parser.add_argument('--depth', type=int, default=ai_solver.MAX_DEPTH)
+    parser.add_argument('--time-budget-ms', type=float, default=None)
+    parser.add_argument('--max-moves', type=int, default=None, help="Stop each game after this many moves")
+    parser.add_argument('--prob-cutoff', type=float, default=0.0,
+                        help="Prune chance nodes below this cumulative spawn probability")
+    parser.add_argument('--spawn-samples', type=int, default=None,
+                        help="Search at most this many empty cells per chance node")
+    parser.add_argument('--adaptive-depth-offset', type=int, default=None,
+                        help="Search max(depth, distinct tiles - offset) moves deep")
+    parser.add_argument('--evaluator', help="n-tuple checkpoint (ntuple.py) to use instead of the heuristic")
+    parser.add_argument('--compare', action='store_true',
+                        help="Also play the same seeds with the exhaustive search and report both")
+    parser.add_argument('--json', help="Write the summary to this JSON file")
+    parser.add_argument('--csv', help="Write one row per game to this CSV file")
+    args = parser.parse_args(argv)
+
+    pruning = {'PROB_CUTOFF': args.prob_cutoff, 'SPAWN_SAMPLES': args.spawn_samples,
+               'ADAPTIVE_DEPTH_OFFSET': args.adaptive_depth_offset}
+    start = time.perf_counter()
+    results = run_games(args.games, args.seed, args.workers, args.depth, args.time_budget_ms, args.max_moves,
+                        pruning, args.evaluator)
+    summary = summarize(results, time.perf_counter() - start)
+
+    if args.compare:
+        start = time.perf_counter()
+        baseline = run_games(args.games, args.seed, args.workers, args.depth, args.time_budget_ms,
+                             args.max_moves, EXHAUSTIVE, args.evaluator)
+        exhaustive = summarize(baseline, time.perf_counter() - start)
+        summary = {
+            'pruned': summary,
+            'exhaustive': exhaustive,
+            'nodes_ratio': (summary['nodes_per_move'] / exhaustive['nodes_per_move']
+                            if exhaustive['nodes_per_move'] else 0.0),
+            'win_rate_delta': summary['win_rate'] - exhaustive['win_rate'],
+        }
+
+    print(json.dumps(summary, indent=2))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(summary, f, indent=2)
+    if args.csv:
+        write_csv(results, args.csv)
+
+
+if __name__ == "__main__":
+    main()
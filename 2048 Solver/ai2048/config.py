@@ -0,0 +1,190 @@
+import copy
+import json
+import os
+
+# --- Settings ---
+# Everything the autoplay scripts used to hardcode at the top of the file.
+# load_config() starts from DEFAULTS, then applies a config file (TOML or
+# JSON), AI2048_<KEY> environment variables and --set overrides, so a
+# checkout runs unmodified on any machine:
+#
+#   AI2048_ADB_PATH='C:\platform-tools\adb.exe' python -m ai2048 play
+#   python -m ai2048 play --config phone.toml --set move_time_budget_ms=100
+
+DEFAULTS = {
+    # --- Device ---
+    'adb_path': 'adb',
+    # 'stream' keeps one adb session open and reads raw frames over the pipe.
+    # 'png' is the old screencap + pull path; 'replay' plays frames from replay_dir.
+    'capture_backend': 'stream',
+    'replay_dir': 'frames',
+    # Fixed board region [y1, y2, x1, x2], used when auto_locate_board is off
+    'crop': [1205, 2550, 90, 1350],
+    # Find the board automatically (see board_locator.py); only the board
+    # region is then transferred and decoded each frame.
+    'auto_locate_board': True,
+    # Board positions found so far, per screen resolution (None = don't save)
+    'board_geometry_cache': 'board_geometry.json',
+    'swipes': {
+        'up': [500, 1700, 500, 1000],
+        'down': [500, 1000, 500, 1700],
+        'left': [800, 1400, 200, 1400],
+        'right': [200, 1400, 800, 1400],
+    },
+    'swipe_ms': 200,
+
+    # --- Colour recognition ---
+    # Average BGR of every tile value, calibrated with `ai2048 calibrate-manual`
+    # (or learned with `ai2048 calibrate`, which writes color_lut_path).
+    'reference_colors': {
+        0: [186, 194, 209], 2: [194, 210, 219], 4: [148, 210, 221], 8: [120, 187, 229],
+        16: [109, 152, 232], 32: [115, 128, 230], 64: [226, 191, 134], 128: [217, 125, 229],
+        256: [102, 197, 135], 512: [192, 194, 70], 1024: [99, 198, 189],
+    },
+    # Largest colour distance still accepted as a match
+    'color_match_threshold': 25.0,
+    # Pixels sampled per tile edge when averaging a tile's colour (None = every pixel)
+    'tile_color_samples': 16,
+    # Colour lookup table learned by auto_calibration.py. When the file exists
+    # it replaces reference_colors and color_match_threshold.
+    'color_lut_path': 'color_lut.npy',
+
+    # --- OCR (play-ocr) ---
+    # None leaves pytesseract to find tesseract on PATH
+    'tesseract_cmd': None,
+    # 'batch' reads all changed tiles in one Tesseract call, 'threads' runs one call per tile
+    'ocr_mode': 'batch',
+    'ocr_threshold': 180,
+    # Folder to dump the cropped tile images into for debugging (None = off)
+    'debug_tile_dir': None,
+    'ocr_crop': [155, 325, 40, 365],
+    'ocr_swipes': {
+        'up': [500, 1200, 500, 400],
+        'down': [500, 400, 500, 1200],
+        'left': [700, 800, 200, 800],
+        'right': [200, 800, 700, 800],
+    },
+
+    # --- Solver ---
+    # Processes the search fans out to (None = every core, 1 = single core)
+    'search_workers': None,
+    # Hard per-move thinking time; the solver deepens its search until this runs out
+    'move_time_budget_ms': 300,
+    # Run capture, recognition, search and swipe as an overlapping asyncio pipeline
+    'pipelined': False,
+    # Move book built with `ai2048 book`; positions in it skip the search
+    'move_book_path': None,
+    # n-tuple checkpoint trained with `ai2048 train`, used instead of the heuristic
+    'evaluator_path': None,
+
+    # --- Logging, metrics and traces ---
+    'log_level': 'INFO',
+    # Collect per-stage timers and search counters
+    'metrics': False,
+    # Append one JSON line of metrics per move to this file (None = don't write)
+    'metrics_path': None,
+    # Run the first search under cProfile and print the report
+    'profile_first_move': False,
+    # Append every turn to this game trace (None = don't record)
+    'trace_path': None,
+    # Also keep the board image of every turn in the trace (a few KB per move)
+    'trace_roi': True,
+}
+
+ENV_PREFIX = 'AI2048_'
+CONFIG_ENV = 'AI2048_CONFIG'
+# Looked for in the working directory when no file is given
+DEFAULT_FILES = ('ai2048.toml', 'ai2048.json')
+
+
+def parse_value(text):
+    """An env/command-line value: JSON when it parses, else the plain string."""
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def read_file(path):
+    """Settings from a .toml or .json file (TOML needs Python 3.11+ or tomli)."""
+    if path.endswith('.toml'):
+        try:
+            import tomllib
+        except ImportError:
+            import tomli as tomllib
+        with open(path, 'rb') as f:
+            data = tomllib.load(f)
+    else:
+        with open(path) as f:
+            data = json.load(f)
+    return data.get('ai2048', data)
+
+
+def _normalize(config):
+    # JSON/TOML keys are strings; tile values are ints everywhere else
+    config['reference_colors'] = {int(k): v for k, v in config['reference_colors'].items()}
+    return config
+
+
+def load_config(path=None, overrides=None, environ=None):
+    """DEFAULTS, then the config file, then AI2048_* env vars, then overrides.
+
+    path falls back to $AI2048_CONFIG and then to ./ai2048.toml or
+    ./ai2048.json; a missing default file is not an error. Unknown keys in the
+    file or overrides raise KeyError so a typo doesn't silently leave a
+    default in place.
+    """
+    environ = os.environ if environ is None else environ
+    config = copy.deepcopy(DEFAULTS)
+    path = path or environ.get(CONFIG_ENV)
+    if path is None:
+        path = next((p for p in DEFAULT_FILES if os.path.exists(p)), None)
+
+    layers = [read_file(path)] if path else []
+    # Other AI2048_* variables (AI2048_CACHE_DIR, ...) are not settings
+    env = {key[len(ENV_PREFIX):].lower(): value for key, value in environ.items() if key.startswith(ENV_PREFIX)}
+    layers.append({key: parse_value(value) for key, value in env.items() if key in DEFAULTS})
+    layers.append(overrides or {})
+    for layer in layers:
+        for key, value in layer.items():
+            if key not in DEFAULTS:
+                raise KeyError(f"Unknown setting {key!r}")
+            config[key] = value
+    return _normalize(config)
+
+
+def parse_overrides(pairs):
+    """--set KEY=VALUE arguments as a dict."""
+    overrides = {}
+    for pair in pairs or ():
+        key, sep, value = pair.partition('=')
+        if not sep:
+            raise ValueError(f"Expected KEY=VALUE, got {pair!r}")
+        overrides[key.strip()] = parse_value(value)
+    return overrides
+
+
+def add_config_arguments(parser):
+    parser.add_argument('--config', help="TOML or JSON settings file (default: $AI2048_CONFIG, ./ai2048.toml)")
+    parser.add_argument('--set', dest='overrides', action='append', metavar='KEY=VALUE', default=[],
+                        help="Override one setting (value parsed as JSON), e.g. --set search_workers=4")
+
+
+def from_args(args):
+    """Settings for a command parsed with add_config_arguments; exits on bad settings."""
+    try:
+        return load_config(args.config, parse_overrides(args.overrides))
+    except (KeyError, ValueError, OSError) as e:
+        raise SystemExit(f"ai2048: bad settings: {e}")
+
+
+def cache_dir():
+    """Where built lookup tables are cached ($AI2048_CACHE_DIR, else ~/.cache/ai2048).
+
+    An empty AI2048_CACHE_DIR turns the cache off.
+    """
+    path = os.environ.get('AI2048_CACHE_DIR')
+    if path is None:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+        path = os.path.join(base, 'ai2048')
+    return path
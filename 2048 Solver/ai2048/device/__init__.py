@@ -0,0 +1 @@
+"""Talking to phones: screen capture, swipes, the autoplay pipeline, fleets and game traces."""
@@ -0,0 +1,234 @@
+import glob
+import logging
+import os
+import subprocess
+from collections import OrderedDict
+
+import numpy as np
+
+from ai2048.instrumentation import timer
+
+log = logging.getLogger(__name__)
+
+# --- Screen capture backends ---
+# Every backend returns the current screen as a BGR uint8 array of shape
+# (height, width, 3), the same thing cv2.imread gives the older scripts.
+# After set_roi((y1, y2, x1, x2)) they return just that region instead.
+
+
+def _imread(path):
+    import cv2  # Only the png and replay backends decode images
+    return cv2.imread(path)
+
+
+# screencap pixel formats (android.graphics.PixelFormat) laid out as 4-byte RGBA;
+# the X byte of RGBX is ignored like the alpha byte
+RGBA_FORMATS = {1: 'RGBA_8888', 2: 'RGBX_8888'}
+
+
+class CaptureBackend:
+    """Interface shared by all capture backends."""
+
+    roi = None
+
+    def set_roi(self, roi):
+        """Restricts capture() to (y1, y2, x1, x2), or the full screen for None."""
+        self.roi = None if roi is None else tuple(roi)
+
+    def _apply_roi(self, frame):
+        if frame is None or self.roi is None:
+            return frame
+        y1, y2, x1, x2 = self.roi
+        return frame[y1:y2, x1:x2]
+
+    def capture(self):
+        """Returns the current frame as a BGR array, or None on failure."""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _adb_cmd(adb_path, serial):
+    cmd = [adb_path]
+    if serial:
+        cmd += ['-s', serial]
+    return cmd
+
+
+class ScreencapPngCapture(CaptureBackend):
+    """The original path: screencap -p to /sdcard, adb pull, cv2.imread.
+
+    Spawns two adb processes and round-trips a PNG through disk per frame.
+    Kept as a fallback for devices where the streaming backend misbehaves.
+    """
+
+    def __init__(self, adb_path='adb', serial=None, local_path='screen2048.png'):
+        self.adb = _adb_cmd(adb_path, serial)
+        self.local_path = local_path
+
+    def capture(self):
+        with timer('capture.device'):
+            subprocess.run(self.adb + ['shell', 'screencap', '-p', '/sdcard/screen2048.png'])
+            subprocess.run(self.adb + ['pull', '/sdcard/screen2048.png', self.local_path],
+                           stdout=subprocess.DEVNULL)
+        import cv2
+        with timer('capture.decode'):
+            return self._apply_roi(cv2.imread(self.local_path))
+
+
+class AdbStreamCapture(CaptureBackend):
+    """Raw framebuffer capture over one long-lived `adb exec-out sh` session.
+
+    Each frame is a `screencap` (no -p, so no PNG encode) written to the
+    session's stdin; the raw RGBA bytes come back over the same pipe and are
+    read into a reused buffer. The returned BGR array is a view of that
+    buffer, so it is only valid until the next capture() call.
+
+    With an ROI set (after one full frame has given the screen size), the
+    device pipes the frame through tail/head so only the ROI's rows are
+    transferred. Other pixel formats (RGB_565, BGRA_8888, ...) raise
+    ValueError, since the frame would decode to the wrong colours.
+    """
+
+    def __init__(self, adb_path='adb', serial=None):
+        self.adb = _adb_cmd(adb_path, serial)
+        self.proc = None
+        self.header_size = None
+        self.width = None
+        self.height = None
+        self._buffer = None
+
+    def _open(self):
+        if self.header_size is None:
+            # Android 9 (SDK 28) added a 4-byte colour space field to the header
+            sdk = subprocess.run(self.adb + ['shell', 'getprop', 'ro.build.version.sdk'],
+                                 capture_output=True, text=True).stdout.strip()
+            self.header_size = 16 if sdk.isdigit() and int(sdk) >= 28 else 12
+        self.proc = subprocess.Popen(self.adb + ['exec-out', 'sh'], stdin=subprocess.PIPE,
+                                     stdout=subprocess.PIPE, bufsize=0)
+
+    def _read_into(self, view):
+        got = 0
+        while got < len(view):
+            n = self.proc.stdout.readinto(view[got:])
+            if not n:
+                raise EOFError("adb session closed")
+            got += n
+
+    def _fill(self, size):
+        if self._buffer is None or len(self._buffer) != size:
+            self._buffer = bytearray(size)
+        self._read_into(memoryview(self._buffer))
+
+    def _capture_rows(self):
+        y1, y2, x1, x2 = self.roi
+        row_bytes = self.width * 4
+        offset = self.header_size + y1 * row_bytes
+        size = (y2 - y1) * row_bytes
+        self.proc.stdin.write(f'screencap | tail -c +{offset + 1} | head -c {size}\n'.encode())
+        self.proc.stdin.flush()
+        self._fill(size)
+        rgba = np.frombuffer(self._buffer, dtype=np.uint8).reshape(y2 - y1, self.width, 4)
+        return rgba[:, x1:x2, 2::-1]
+
+    def capture(self):
+        try:
+            with timer('capture.device'):
+                if self.proc is None or self.proc.poll() is not None:
+                    self._open()
+                if self.roi is not None and self.width is not None:
+                    return self._capture_rows()
+                self.proc.stdin.write(b'screencap\n')
+                self.proc.stdin.flush()
+
+                header = bytearray(self.header_size)
+                self._read_into(memoryview(header))
+                width = int.from_bytes(header[0:4], 'little')
+                height = int.from_bytes(header[4:8], 'little')
+                pixel_format = int.from_bytes(header[8:12], 'little')
+                if pixel_format not in RGBA_FORMATS:
+                    self.close()
+                    raise ValueError(f"Unsupported screencap pixel format {pixel_format} "
+                                     f"(expected one of {sorted(RGBA_FORMATS)})")
+                self.width, self.height = width, height
+                self._fill(width * height * 4)
+        except (OSError, EOFError) as e:
+            log.error(f"❌ Stream capture failed: {e}")
+            self.close()
+            return None
+
+        with timer('capture.decode'):
+            rgba = np.frombuffer(self._buffer, dtype=np.uint8).reshape(height, width, 4)
+            return self._apply_roi(rgba[:, :, 2::-1])  # RGBA -> BGR without copying
+
+    def close(self):
+        if self.proc is not None:
+            try:
+                self.proc.stdin.close()
+            except OSError:
+                pass
+            self.proc.kill()
+            self.proc.wait()
+            self.proc = None
+
+
+class ReplayCapture(CaptureBackend):
+    """Fake device that replays recorded frames from a directory.
+
+    Frames are .png/.jpg screenshots or .npy BGR arrays, played in file name
+    order. With loop=False, capture() returns None after the last frame.
+    The cache_size most recently played frames are kept decoded.
+    """
+
+    def __init__(self, frame_dir, loop=True, cache_size=64):
+        paths = []
+        for pattern in ('*.png', '*.jpg', '*.npy'):
+            paths += glob.glob(os.path.join(frame_dir, pattern))
+        if not paths:
+            raise FileNotFoundError(f"No frames found in {frame_dir}")
+        self.paths = sorted(paths)
+        self.loop = loop
+        self.index = 0
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+
+    def _load(self, path):
+        frame = self._cache.get(path)
+        if frame is not None:
+            self._cache.move_to_end(path)
+            return frame
+        frame = np.load(path) if path.endswith('.npy') else _imread(path)
+        self._cache[path] = frame
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return frame
+
+    def capture(self):
+        if self.index >= len(self.paths):
+            if not self.loop:
+                return None
+            self.index = 0
+        frame = self._load(self.paths[self.index])
+        self.index += 1
+        return self._apply_roi(frame)
+
+
+BACKENDS = {
+    'png': ScreencapPngCapture,
+    'stream': AdbStreamCapture,
+    'replay': ReplayCapture,
+}
+
+
+def make_capture(kind='stream', **kwargs):
+    """Builds a capture backend by name: 'stream', 'png' or 'replay'."""
+    if kind not in BACKENDS:
+        raise ValueError(f"Unknown capture backend: {kind}")
+    return BACKENDS[kind](**kwargs)
@@ -0,0 +1,346 @@
+import argparse
+import asyncio
+import copy
+import glob
+import json
+import logging
+import os
+import random
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from ai2048.solver import ai_solver
+from ai2048.engine.bitboard import bitboard_to_board, execute_move, spawn_random_tile, max_rank
+from ai2048.vision.board_locator import BoardCapture, BoardLocator
+from ai2048.vision.board_recognition import ColorBoardRecognizer, LutBoardRecognizer
+from ai2048.vision.board_tracker import BoardTracker
+from ai2048 import config as settings
+from ai2048.config import DEFAULTS
+from ai2048.device.capture import CaptureBackend, make_capture
+from ai2048.device.game_trace import TraceWriter
+from ai2048.device.pipeline import AutoplayPipeline
+
+log = logging.getLogger(__name__)
+
+# --- Fleet runner ---
+# Drives several phones from one host. Every device gets its own capture
+# session, board tracker and AutoplayPipeline on a shared event loop, and all
+# of their searches go to one process pool, so the transposition tables,
+# heuristic tables and move book in the pool workers are shared by the whole
+# fleet instead of each phone starting cold.
+
+# Calibration used for any device without its own profile: the same settings
+# `ai2048 play` starts from (config.DEFAULTS). Profiles files override any of
+# these keys.
+DEFAULT_PROFILE = {
+    'crop': DEFAULTS['crop'],  # y1, y2, x1, x2, or 'auto' to locate the board
+    'swipes': DEFAULTS['swipes'],
+    'reference_colors': DEFAULTS['reference_colors'],
+    'threshold': DEFAULTS['color_match_threshold'],
+    'color_lut': None,  # auto_calibration.py table; replaces reference_colors when set
+}
+
+# Side of the square screen simulated devices render (the board fills it)
+SIMULATED_SIZE = 256
+# Colour of the grid lines between simulated tiles
+SIMULATED_GRID_COLOR = (160, 173, 187)
+# Seconds a fake device takes to "animate" a swipe
+FAKE_SWIPE_LATENCY = 0.05
+
+
+def discover_devices(adb_path='adb'):
+    """Serials of every device `adb devices` lists as ready."""
+    out = subprocess.run([adb_path, 'devices'], capture_output=True, text=True).stdout
+    serials = []
+    for line in out.splitlines()[1:]:
+        parts = line.split()
+        if len(parts) >= 2 and parts[1] == 'device':
+            serials.append(parts[0])
+    return serials
+
+
+def load_profiles(path):
+    """Reads {serial or 'default': profile overrides} from a JSON file."""
+    with open(path) as f:
+        profiles = json.load(f)
+    for profile in profiles.values():
+        if 'reference_colors' in profile:
+            profile['reference_colors'] = {int(value): color
+                                           for value, color in profile['reference_colors'].items()}
+    return profiles
+
+
+def profile_for(serial, profiles=None):
+    """DEFAULT_PROFILE, then the file's 'default' entry, then the device's own."""
+    profile = copy.deepcopy(DEFAULT_PROFILE)
+    for name in ('default', serial):
+        profile.update((profiles or {}).get(name, {}))
+    return profile
+
+
+def render_board(bb, palette, size=SIMULATED_SIZE):
+    """A size x size screen of flat tiles in palette colours with grid lines.
+
+    palette maps tile value -> BGR; values above the largest key are drawn
+    in its colour.
+    """
+    tile = size // 4
+    top = palette[max(palette)]
+    colors = np.array([[palette.get(int(v), top) for v in row] for row in bitboard_to_board(bb)],
+                      dtype=np.uint8)
+    frame = np.repeat(np.repeat(colors, tile, axis=0), tile, axis=1)
+    frame[::tile, :] = SIMULATED_GRID_COLOR
+    frame[:, ::tile] = SIMULATED_GRID_COLOR
+    return frame
+
+
+# --- Fake devices ---
+# Both fake devices are capture backends that also take swipes, so a fleet
+# can be load-tested on one machine without phones.
+
+class SimulatedDevice(CaptureBackend):
+    """A phone simulated with the game rules and rendered in profile colours.
+
+    Tiles above the largest reference colour are drawn in that colour, so the
+    recognizer will start misreading once a game outgrows the calibration.
+    """
+
+    def __init__(self, reference_colors, seed=0, size=SIMULATED_SIZE):
+        self.palette = {value: np.array(color, dtype=np.uint8) for value, color in reference_colors.items()}
+        self.top_value = max(self.palette)
+        self.rng = random.Random(seed)
+        self.size = size
+        self.bb = spawn_random_tile(spawn_random_tile(0, self.rng), self.rng)
+        self.score = 0
+        self.frame = self._render()
+
+    def _render(self):
+        return render_board(self.bb, self.palette, self.size)
+
+    def capture(self):
+        return self.frame
+
+    def swipe(self, move):
+        moved, gained = execute_move(self.bb, move)
+        if moved != self.bb:
+            self.bb = spawn_random_tile(moved, self.rng)
+            self.score += gained
+            self.frame = self._render()
+
+    @property
+    def max_tile(self):
+        return 1 << max_rank(self.bb)
+
+
+class ReplayDevice(CaptureBackend):
+    """Replays recorded frames from a directory, advancing one per swipe."""
+
+    def __init__(self, frame_dir, offset=0):
+        paths = []
+        for pattern in ('*.png', '*.jpg', '*.npy'):
+            paths += glob.glob(os.path.join(frame_dir, pattern))
+        if not paths:
+            raise FileNotFoundError(f"No frames found in {frame_dir}")
+        import cv2
+        self.frames = [np.load(p) if p.endswith('.npy') else cv2.imread(p) for p in sorted(paths)]
+        self.index = offset % len(self.frames)
+
+    def capture(self):
+        return self.frames[self.index]
+
+    def swipe(self, move):
+        self.index = (self.index + 1) % len(self.frames)
+
+
+# --- Sessions ---
+
+class DeviceSession(AutoplayPipeline):
+    """AutoplayPipeline for one device of the fleet."""
+
+    def __init__(self, serial, capture, profile, adb_path, executor, time_budget_ms=None, swipe_ms=100,
+                 trace=None):
+        if profile.get('color_lut'):
+            recognizer = LutBoardRecognizer.load(profile['color_lut'])
+        else:
+            recognizer = ColorBoardRecognizer(profile['reference_colors'], profile['threshold'])
+        crop = None if profile['crop'] == 'auto' else tuple(profile['crop'])
+        super().__init__(capture, BoardTracker(recognizer), crop,
+                         {move: tuple(coords) for move, coords in profile['swipes'].items()},
+                         [adb_path, '-s', serial], time_budget_ms=time_budget_ms,
+                         swipe_ms=swipe_ms, executor=executor, max_speculations=0, trace=trace)
+        self.serial = serial
+        self.error = None
+
+    async def swipe(self, move):
+        device = getattr(self.capture, 'backend', self.capture)  # Unwrap BoardCapture
+        if hasattr(device, 'swipe'):
+            device.swipe(move)
+            await asyncio.sleep(FAKE_SWIPE_LATENCY)
+            return 0
+        return await super().swipe(move)
+
+    async def run_safely(self, max_moves=None):
+        """run() that records a failure instead of taking the fleet down."""
+        try:
+            return await self.run(max_moves)
+        except Exception as e:
+            log.exception(f"❌ Device {self.serial} stopped")
+            self.error = repr(e)
+            return self.stats()
+
+
+def _trace_for(trace_dir, serial):
+    if not trace_dir:
+        return None
+    os.makedirs(trace_dir, exist_ok=True)
+    return TraceWriter(os.path.join(trace_dir, f"{serial.replace(':', '_')}.trace"))
+
+
+def make_sessions(serials, profiles=None, adb_path='adb', executor=None, time_budget_ms=None,
+                  capture_backend='stream', swipe_ms=100, trace_dir=None):
+    """One DeviceSession per real device serial.
+
+    Devices whose crop is 'auto' share one BoardLocator, so phones with the
+    same resolution only locate the board once. With trace_dir every device
+    records a game trace named after its serial there.
+    """
+    locator = BoardLocator()
+    sessions = []
+    for serial in serials:
+        profile = profile_for(serial, profiles)
+        capture = make_capture(capture_backend, adb_path=adb_path, serial=serial)
+        if profile['crop'] == 'auto':
+            capture = BoardCapture(capture, locator)
+        sessions.append(DeviceSession(serial, capture, profile, adb_path, executor, time_budget_ms, swipe_ms,
+                                      _trace_for(trace_dir, serial)))
+    return sessions
+
+
+def make_fake_sessions(count, executor=None, time_budget_ms=None, frame_dir=None, profiles=None, seed=0,
+                       trace_dir=None):
+    """count simulated phones, or replaying phones if frame_dir is given."""
+    locator = BoardLocator()
+    sessions = []
+    for i in range(count):
+        serial = f"fake-{i}"
+        profile = profile_for(serial, profiles)
+        if frame_dir:
+            device = ReplayDevice(frame_dir, offset=i)
+            if profile['crop'] == 'auto':
+                device = BoardCapture(device, locator)
+        else:
+            device = SimulatedDevice(profile['reference_colors'], seed=seed + i)
+            profile['crop'] = [0, device.size, 0, device.size]
+        sessions.append(DeviceSession(serial, device, profile, 'adb', executor, time_budget_ms,
+                                      trace=_trace_for(trace_dir, serial)))
+    return sessions
+
+
+# --- Running ---
+
+def _percentiles(values):
+    arr = np.array(values, dtype=np.float64)
+    if not arr.size:
+        return {'p50_ms': 0.0, 'p95_ms': 0.0, 'mean_ms': 0.0}
+    return {'p50_ms': float(np.percentile(arr, 50)), 'p95_ms': float(np.percentile(arr, 95)),
+            'mean_ms': float(arr.mean())}
+
+
+def fleet_stats(sessions, wall_time_s):
+    """Per-device pipeline stats plus fleet-wide totals."""
+    devices = {}
+    for session in sessions:
+        stats = session.stats()
+        stats['full_reads'] = session.tracker.full_reads
+        stats['incremental_reads'] = session.tracker.incremental_reads
+        if isinstance(session.capture, SimulatedDevice):
+            stats['score'] = session.capture.score
+            stats['max_tile'] = session.capture.max_tile
+        if session.error:
+            stats['error'] = session.error
+        devices[session.serial] = stats
+
+    total_moves = sum(session.moves for session in sessions)
+    stages = sorted({stage for session in sessions for stage in session.timings})
+    return {
+        'devices': devices,
+        'aggregate': {
+            'devices': len(sessions),
+            'failed': sum(1 for session in sessions if session.error),
+            'moves': total_moves,
+            'wall_time_s': wall_time_s,
+            'moves_per_minute': total_moves / wall_time_s * 60.0 if wall_time_s else 0.0,
+            'stages': {stage: _percentiles([ms for session in sessions for ms in session.timings[stage]])
+                       for stage in stages},
+        },
+    }
+
+
+async def run_fleet(sessions, max_moves=None):
+    """Plays every session concurrently until each stops or hits max_moves."""
+    loop = asyncio.get_running_loop()
+    # Every device blocks a thread while it captures
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=len(sessions) + 4))
+    start = time.perf_counter()
+    await asyncio.gather(*(session.run_safely(max_moves) for session in sessions))
+    return fleet_stats(sessions, time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play 2048 on several devices with one shared solver pool.")
+    parser.add_argument('--adb', help="Path to the adb executable (default: adb_path setting)")
+    parser.add_argument('--serials', nargs='*', help="Devices to drive (default: every device adb lists)")
+    parser.add_argument('--profiles', help="JSON file of per-device crop/swipe/colour profiles")
+    parser.add_argument('--capture', default='stream', choices=['stream', 'png'])
+    parser.add_argument('--fake', type=int, default=0, help="Drive this many fake devices instead")
+    parser.add_argument('--fake-frames', help="Fake devices replay frames from this directory "
+                                              "instead of simulating games")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Shared search processes")
+    parser.add_argument('--time-budget-ms', type=float, default=None)
+    parser.add_argument('--max-moves', type=int, default=None, help="Stop each device after this many moves")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help="Write the stats to this JSON file")
+    parser.add_argument('--trace-dir', help="Record a game trace per device in this directory")
+    parser.add_argument('--move-book', help="Move book for every device (default: move_book_path setting)")
+    parser.add_argument('--evaluator', help="n-tuple checkpoint to search with (default: evaluator_path setting)")
+    settings.add_config_arguments(parser)
+    args = parser.parse_args(argv)
+    config = settings.from_args(args)
+    adb_path = args.adb or config['adb_path']
+
+    logging.basicConfig(level=logging.WARNING, format="%(message)s")
+    profiles = load_profiles(args.profiles) if args.profiles else None
+    # Before the pool starts, so every worker opens the same book and checkpoint
+    ai_solver.load_move_book(args.move_book or config['move_book_path'])
+    ai_solver.load_evaluator(args.evaluator or config['evaluator_path'])
+    executor = ai_solver.get_executor(max(args.workers, 1))
+    if args.fake:
+        sessions = make_fake_sessions(args.fake, executor, args.time_budget_ms, args.fake_frames,
+                                      profiles, args.seed, args.trace_dir)
+    else:
+        serials = args.serials or discover_devices(adb_path)
+        if not serials:
+            parser.error("No devices found")
+        sessions = make_sessions(serials, profiles, adb_path, executor, args.time_budget_ms, args.capture,
+                                 trace_dir=args.trace_dir)
+
+    try:
+        stats = asyncio.run(run_fleet(sessions, args.max_moves))
+    finally:
+        for session in sessions:
+            session.capture.close()
+            if session.trace is not None:
+                session.trace.close()
+        ai_solver.shutdown_executor()
+
+    print(json.dumps(stats['aggregate'], indent=2))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(stats, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
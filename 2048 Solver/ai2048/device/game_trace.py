@@ -0,0 +1,401 @@
+import argparse
+import bisect
+import json
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+from collections import namedtuple
+
+import numpy as np
+
+from ai2048.solver import ai_solver
+from ai2048.engine.bitboard import MOVES, board_to_bitboard, bitboard_to_board
+from ai2048.vision.board_recognition import ColorBoardRecognizer, LutBoardRecognizer
+
+# --- Game traces ---
+# An append-only binary log of every turn: the board that was read, the move
+# played, how the search found it, per-stage timings and optionally the board
+# region as zlib-compressed pixels. Records are written in chunks by a
+# background thread, and every chunk gets an entry in a small index file
+# beside the trace, so record N is one seek away however long the session.
+#
+# Layout (little-endian):
+#   trace:  HEADER, then chunks of CHUNK_HEADER + records
+#   record: RECORD, then roi_len bytes of ROI_HEADER + zlib data
+#   .idx:   one INDEX_ENTRY (first record, record count, chunk offset) per chunk
+# A crash can at worst lose the chunk being written; readers rebuild a
+# missing or short index by walking the chunk headers.
+
+MAGIC = b'2048TRCE'
+VERSION = 1
+HEADER = struct.Struct('<8sI')
+CHUNK_MAGIC = b'CHNK'
+CHUNK_HEADER = struct.Struct('<4sIII')  # magic, first record, records, payload bytes
+# index, unix time, bitboard, move, depth, flags, nodes, leaves, value,
+# capture/recognize/search/swipe ms, roi bytes
+RECORD = struct.Struct('<IdQBBBxIIfffffI')
+ROI_HEADER = struct.Struct('<HHB')  # height, width, channels
+INDEX_ENTRY = struct.Struct('<IIQ')
+
+FLAG_BOOK = 1
+# The search ran out of time before comparing every move at the recorded depth
+FLAG_PARTIAL = 2
+NO_MOVE = 255
+
+# Records per chunk; a seek reads at most one chunk
+CHUNK_RECORDS = 256
+# zlib level for board images (1 = fastest)
+ROI_COMPRESSION = 1
+
+TraceRecord = namedtuple('TraceRecord', [
+    'index', 'time', 'board', 'move', 'depth', 'book', 'partial', 'nodes', 'leaves', 'value',
+    'capture_ms', 'recognize_ms', 'search_ms', 'swipe_ms', 'roi'])
+
+
+def encode_roi(roi):
+    roi = np.ascontiguousarray(roi, dtype=np.uint8)
+    channels = roi.shape[2] if roi.ndim == 3 else 1
+    return ROI_HEADER.pack(roi.shape[0], roi.shape[1], channels) + zlib.compress(roi.tobytes(), ROI_COMPRESSION)
+
+
+def decode_roi(blob):
+    """The board image stored with a record, or None."""
+    if not blob:
+        return None
+    height, width, channels = ROI_HEADER.unpack_from(blob)
+    pixels = np.frombuffer(zlib.decompress(blob[ROI_HEADER.size:]), dtype=np.uint8)
+    return pixels.reshape((height, width, channels) if channels > 1 else (height, width))
+
+
+def _pack(index, entry):
+    board, move, stats, timings, roi, when = entry
+    bb = board if isinstance(board, int) else board_to_bitboard(board)
+    blob = encode_roi(roi) if roi is not None else b''
+    stats = stats or {}
+    timings = timings or {}
+    flags = (FLAG_BOOK if stats.get('book') else 0) | (FLAG_PARTIAL if stats.get('partial') else 0)
+    return RECORD.pack(
+        index, when, bb, MOVES.index(move) if move else NO_MOVE, min(int(stats.get('depth', 0)), 255),
+        flags, int(stats.get('nodes', 0)) & 0xFFFFFFFF,
+        int(stats.get('leaves', 0)) & 0xFFFFFFFF, float(stats.get('value', 0.0)),
+        timings.get('capture', 0.0), timings.get('recognize', 0.0), timings.get('search', 0.0),
+        timings.get('swipe', 0.0), len(blob)) + blob
+
+
+def _unpack(buffer, offset):
+    """(TraceRecord, offset of the next record)."""
+    (index, when, bb, move, depth, flags, nodes, leaves, value,
+     capture_ms, recognize_ms, search_ms, swipe_ms, roi_len) = RECORD.unpack_from(buffer, offset)
+    start = offset + RECORD.size
+    roi = bytes(buffer[start:start + roi_len]) if roi_len else None
+    record = TraceRecord(index, when, bb, None if move == NO_MOVE else MOVES[move], depth,
+                         bool(flags & FLAG_BOOK), bool(flags & FLAG_PARTIAL), nodes, leaves, value,
+                         capture_ms, recognize_ms, search_ms, swipe_ms, roi)
+    return record, start + roi_len
+
+
+# --- Reading ---
+
+class TraceReader:
+    """Random access to the records of a trace file.
+
+    len(reader) is the number of complete records, reader[n] reads record n
+    from its chunk and iterating reads chunk by chunk.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'rb')
+        magic, version = HEADER.unpack(self.file.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a game trace")
+        if version != VERSION:
+            raise ValueError(f"{path} is trace version {version}, expected {VERSION}")
+        self.chunks = self._load_index()
+        self._firsts = [first for first, _, _ in self.chunks]
+        self._cached = (None, None)
+
+    def _load_index(self):
+        """[(first record, records, offset)] from the .idx file, completed by scanning."""
+        chunks = []
+        index_path = self.path + '.idx'
+        if os.path.exists(index_path):
+            with open(index_path, 'rb') as f:
+                data = f.read()
+            usable = len(data) - len(data) % INDEX_ENTRY.size
+            chunks = [INDEX_ENTRY.unpack_from(data, pos) for pos in range(0, usable, INDEX_ENTRY.size)]
+
+        # Chunks written after the last index entry (or with no index at all)
+        size = os.fstat(self.file.fileno()).st_size
+        offset = HEADER.size
+        if chunks:
+            offset = chunks[-1][2] + CHUNK_HEADER.size + self._payload_size(chunks[-1][2])
+        while offset + CHUNK_HEADER.size <= size:
+            self.file.seek(offset)
+            magic, first, count, payload = CHUNK_HEADER.unpack(self.file.read(CHUNK_HEADER.size))
+            if magic != CHUNK_MAGIC or offset + CHUNK_HEADER.size + payload > size:
+                break  # Torn write at the end of the file
+            chunks.append((first, count, offset))
+            offset += CHUNK_HEADER.size + payload
+        self.end = offset
+        return chunks
+
+    def _payload_size(self, offset):
+        self.file.seek(offset)
+        return CHUNK_HEADER.unpack(self.file.read(CHUNK_HEADER.size))[3]
+
+    def __len__(self):
+        if not self.chunks:
+            return 0
+        first, count, _ = self.chunks[-1]
+        return first + count
+
+    def read_chunk(self, i):
+        """Every record of chunk i."""
+        if self._cached[0] == i:
+            return self._cached[1]
+        first, count, offset = self.chunks[i]
+        self.file.seek(offset)
+        payload = CHUNK_HEADER.unpack(self.file.read(CHUNK_HEADER.size))[3]
+        buffer = self.file.read(payload)
+        records = []
+        pos = 0
+        for _ in range(count):
+            record, pos = _unpack(buffer, pos)
+            records.append(record)
+        self._cached = (i, records)
+        return records
+
+    def __getitem__(self, n):
+        if n < 0:
+            n += len(self)
+        if not 0 <= n < len(self):
+            raise IndexError(n)
+        i = bisect.bisect_right(self._firsts, n) - 1
+        return self.read_chunk(i)[n - self.chunks[i][0]]
+
+    def records(self, start=0, stop=None):
+        """Records start..stop-1, reading only the chunks they are in."""
+        stop = len(self) if stop is None else min(stop, len(self))
+        if start >= stop:
+            return
+        for i in range(bisect.bisect_right(self._firsts, start) - 1, len(self.chunks)):
+            first, count, _ = self.chunks[i]
+            if first >= stop:
+                break
+            for record in self.read_chunk(i)[max(start - first, 0):stop - first]:
+                yield record
+
+    def __iter__(self):
+        return self.records()
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# --- Writing ---
+
+class TraceWriter:
+    """Appends turns to a trace from a background thread.
+
+    record() only queues its arguments, so packing, compressing and disk
+    writes stay off the move loop. An existing trace is continued after its
+    last complete record.
+    """
+
+    def __init__(self, path, chunk_records=CHUNK_RECORDS):
+        self.path = path
+        self.chunk_records = chunk_records
+        self.next_index = 0
+        if os.path.exists(path) and os.path.getsize(path) >= HEADER.size:
+            with TraceReader(path) as reader:
+                self.next_index = len(reader)
+                end = reader.end
+                chunks = reader.chunks
+            self.file = open(path, 'r+b')
+            self.file.truncate(end)  # Drop a torn chunk left by a crash
+            self.file.seek(end)
+            with open(path + '.idx', 'wb') as f:
+                f.write(b''.join(INDEX_ENTRY.pack(*chunk) for chunk in chunks))
+        else:
+            self.file = open(path, 'wb')
+            self.file.write(HEADER.pack(MAGIC, VERSION))
+            open(path + '.idx', 'wb').close()
+        self.index_file = open(path + '.idx', 'ab')
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='trace-writer', daemon=True)
+        self._thread.start()
+
+    def record(self, board, move, stats=None, timings=None, roi=None):
+        """Queues one turn.
+
+        board is a 4x4 array or a bitboard, stats an ai_solver.search result,
+        timings {'capture'|'recognize'|'search'|'swipe': ms} and roi the
+        board image to keep (copied here, since capture buffers get reused).
+        """
+        if roi is not None:
+            roi = np.array(roi, dtype=np.uint8, copy=True)
+        self._queue.put((board, move, stats, timings, roi, time.time()))
+
+    def flush(self):
+        """Writes everything queued so far, including a partial chunk."""
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait()
+
+    def _write_chunk(self, records):
+        if not records:
+            return
+        payload = b''.join(records)
+        offset = self.file.tell()
+        first = self.next_index - len(records)
+        self.file.write(CHUNK_HEADER.pack(CHUNK_MAGIC, first, len(records), len(payload)) + payload)
+        self.file.flush()
+        self.index_file.write(INDEX_ENTRY.pack(first, len(records), offset))
+        self.index_file.flush()
+
+    def _run(self):
+        pending = []
+        while True:
+            item = self._queue.get()
+            if item is None or isinstance(item, threading.Event):
+                self._write_chunk(pending)
+                pending = []
+                if item is None:
+                    return
+                item.set()
+                continue
+            pending.append(_pack(self.next_index, item))
+            self.next_index += 1
+            if len(pending) >= self.chunk_records:
+                self._write_chunk(pending)
+                pending = []
+
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        self.file.close()
+        self.index_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# --- Replay ---
+
+def replay(reader, recognizer=None, depth=None, start=0, stop=None):
+    """Reruns recognition and the search on recorded turns; yields the differences.
+
+    Each yielded dict has the record index and any of 'board' (recorded and
+    re-read boards, when the record has an image) and 'move' (recorded and
+    re-searched move). The search runs at depth, or at the depth the record
+    reached, so a time-budgeted session replays deterministically. Book moves
+    and partial iterations (only some moves searched before the deadline)
+    can't be searched again the same way, so their moves are not compared.
+    """
+    for record in reader.records(start, stop):
+        diff = {}
+        if recognizer is not None and record.roi:
+            board, _, _ = recognizer.read(decode_roi(record.roi))
+            if board_to_bitboard(board) != record.board:
+                diff['board'] = (bitboard_to_board(record.board).tolist(), np.asarray(board).tolist())
+        if not record.book and not record.partial:
+            ai_solver.TRANSPOSITION_TABLE.clear()
+            move = ai_solver.best_move(record.board, depth or max(record.depth, 1), workers=1)
+            if move != record.move:
+                diff['move'] = (record.move, move)
+        if diff:
+            diff['index'] = record.index
+            yield diff
+
+
+def summarize(reader):
+    """Counts, per-stage mean timings and search depths of a trace."""
+    records = list(reader)
+    stages = ('capture_ms', 'recognize_ms', 'search_ms', 'swipe_ms')
+    return {
+        'records': len(records),
+        'chunks': len(reader.chunks),
+        'with_roi': sum(1 for r in records if r.roi),
+        'book_moves': sum(1 for r in records if r.book),
+        'partial_moves': sum(1 for r in records if r.partial),
+        'duration_s': records[-1].time - records[0].time if records else 0.0,
+        'mean_ms': {stage[:-3]: float(np.mean([getattr(r, stage) for r in records])) if records else 0.0
+                    for stage in stages},
+        'depths': {str(d): n for d, n in sorted(
+            (d, sum(1 for r in records if r.depth == d)) for d in {r.depth for r in records})},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect and replay game traces.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    info = commands.add_parser('info', help="Summarize a trace")
+    info.add_argument('trace')
+    show = commands.add_parser('show', help="Print one record")
+    show.add_argument('trace')
+    show.add_argument('index', type=int)
+    show.add_argument('--save-roi', help="Write the record's board image to this .png")
+    rerun = commands.add_parser('replay', help="Rerun recognition and best_move and report differences")
+    rerun.add_argument('trace')
+    rerun.add_argument('--start', type=int, default=0)
+    rerun.add_argument('--count', type=int, default=None)
+    rerun.add_argument('--depth', type=int, default=None, help="Search depth (default: as recorded)")
+    rerun.add_argument('--lut', help="Colour LUT from auto_calibration.py to re-read the boards with")
+    rerun.add_argument('--colors', help="JSON file of {tile value: [B, G, R]} to re-read the boards with")
+    rerun.add_argument('--threshold', type=float, default=25.0, help="Colour match threshold for --colors")
+    rerun.add_argument('--evaluator', help="n-tuple checkpoint to search with")
+    rerun.add_argument('--json', help="Write the differences to this JSON file")
+    args = parser.parse_args(argv)
+
+    with TraceReader(args.trace) as reader:
+        if args.command == 'info':
+            print(json.dumps(summarize(reader), indent=2))
+        elif args.command == 'show':
+            record = reader[args.index]
+            print(record._replace(roi=f"{len(record.roi)} bytes" if record.roi else None))
+            print(bitboard_to_board(record.board))
+            if args.save_roi and record.roi:
+                import cv2
+                cv2.imwrite(args.save_roi, decode_roi(record.roi))
+        else:
+            recognizer = None  # Without colours only the search is replayed
+            if args.lut:
+                recognizer = LutBoardRecognizer.load(args.lut)
+            elif args.colors:
+                with open(args.colors) as f:
+                    colors = {int(value): color for value, color in json.load(f).items()}
+                recognizer = ColorBoardRecognizer(colors, args.threshold)
+            ai_solver.load_evaluator(args.evaluator)
+            stop = None if args.count is None else args.start + args.count
+            diffs = []
+            for diff in replay(reader, recognizer, args.depth, args.start, stop):
+                diffs.append(diff)
+                if 'board' in diff:
+                    print(f"#{diff['index']}: board read differently\n  recorded {diff['board'][0]}\n"
+                          f"  replayed {diff['board'][1]}")
+                if 'move' in diff:
+                    print(f"#{diff['index']}: recorded {diff['move'][0]}, replayed {diff['move'][1]}")
+            replayed = min(len(reader), stop or len(reader)) - args.start
+            print(f"{replayed} records replayed: {sum('board' in d for d in diffs)} board differences, "
+                  f"{sum('move' in d for d in diffs)} move differences")
+            if args.json:
+                with open(args.json, 'w') as f:
+                    json.dump(diffs, f, indent=1)
+
+
+if __name__ == "__main__":
+    main()
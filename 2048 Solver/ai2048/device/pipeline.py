@@ -0,0 +1,218 @@
+import asyncio
+import concurrent.futures
+import logging
+import time
+from collections import defaultdict
+
+import numpy as np
+
+from ai2048.solver import ai_solver
+from ai2048 import instrumentation
+from ai2048.engine.bitboard import board_to_bitboard, empty_cells
+
+log = logging.getLogger(__name__)
+
+# --- Pipelined autoplay ---
+# The sequential loop runs capture -> read -> search -> swipe one after the
+# other. Here the swipe runs as an async subprocess, the next board is
+# predicted the moment the move is chosen, and searches for its likely spawn
+# outcomes start on the solver's process pool while the animation plays.
+# Both loops poll the screen until it stops changing after a swipe.
+
+# Seconds between polls while waiting for the swipe animation to settle
+POLL_INTERVAL = 0.03
+# Give up waiting for a stable, changed frame after this long
+SETTLE_TIMEOUT = 2.0
+# Spawn outcomes searched speculatively per move (most likely first)
+MAX_SPECULATIONS = 8
+
+
+class AutoplayPipeline:
+    """Asyncio orchestrator for capture, recognition, search and swipe.
+
+    capture is a capture.CaptureBackend, tracker a board_tracker.BoardTracker,
+    crop a (y1, y2, x1, x2) tuple for the board region (None when the capture
+    already returns just the board) and swipes maps
+    'up'/'down'/'left'/'right' to (x1, y1, x2, y2) screen coordinates.
+
+    executor is an existing process pool to run every search on (the fleet
+    runner shares one between devices); without it searches run on a thread
+    and speculation uses ai_solver's pool when search_workers > 1.
+
+    trace is a game_trace.TraceWriter that every turn is recorded to, with
+    the board image when trace_roi is set.
+    """
+
+    def __init__(self, capture, tracker, crop, swipes, adb_cmd, search_workers=1,
+                 time_budget_ms=None, swipe_ms=100, executor=None, max_speculations=MAX_SPECULATIONS,
+                 trace=None, trace_roi=True):
+        self.capture = capture
+        self.tracker = tracker
+        self.crop = crop
+        self.swipes = swipes
+        self.adb_cmd = list(adb_cmd)
+        self.search_workers = search_workers
+        self.time_budget_ms = time_budget_ms
+        self.swipe_ms = swipe_ms
+        self.executor = executor
+        self.max_speculations = max_speculations
+        self.trace = trace
+        self.trace_roi = trace_roi
+        self.timings = defaultdict(list)
+        self.moves = 0
+        self.speculation_hits = 0
+        self.started = None
+
+    # --- Stages ---
+
+    def _crop(self, frame):
+        if self.crop is None:
+            return frame
+        y1, y2, x1, x2 = self.crop
+        return frame[y1:y2, x1:x2]
+
+    def _signature(self, frame):
+        """Coarse per-tile colours, cheap enough to compare every poll."""
+        return self.tracker.recognizer.tile_colors(self._crop(frame), samples=4)
+
+    async def _timed(self, stage, awaitable):
+        start = time.perf_counter()
+        result = await awaitable
+        elapsed = time.perf_counter() - start
+        self.timings[stage].append(elapsed * 1000.0)
+        instrumentation.observe(stage, elapsed)
+        return result
+
+    async def capture_stable(self, previous=None):
+        """Polls until two consecutive frames match (and differ from previous)."""
+        loop = asyncio.get_running_loop()
+        deadline = time.monotonic() + SETTLE_TIMEOUT
+        last = None
+        while True:
+            frame = await loop.run_in_executor(None, self.capture.capture)
+            if frame is None:
+                return None
+            signature = self._signature(frame)
+            settled = last is not None and np.array_equal(signature, last)
+            changed = previous is None or not np.array_equal(signature, previous)
+            if (settled and changed) or time.monotonic() > deadline:
+                return frame, signature
+            last = signature
+            await asyncio.sleep(POLL_INTERVAL)
+
+    async def swipe(self, move):
+        x1, y1, x2, y2 = self.swipes[move]
+        proc = await asyncio.create_subprocess_exec(
+            *self.adb_cmd, 'shell', 'input', 'swipe',
+            str(x1), str(y1), str(x2), str(y2), str(self.swipe_ms),
+            stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL)
+        return await proc.wait()
+
+    def _search(self, board):
+        return ai_solver.search(board, workers=self.search_workers, time_budget_ms=self.time_budget_ms)
+
+    def speculate(self, predicted):
+        """Starts searches for the most likely spawns on the predicted board.
+
+        Returns {bitboard: future}. Every empty cell is equally likely and a
+        '2' is nine times likelier than a '4', so the 2-spawns go first.
+        """
+        if predicted is None or self.max_speculations <= 0:
+            return {}
+        executor = self.executor
+        if executor is None:
+            if self.search_workers < 2:
+                return {}
+            executor = ai_solver.get_executor(self.search_workers)
+        bb = board_to_bitboard(predicted)
+        cells = empty_cells(bb)
+        outcomes = [bb | (1 << (4 * c)) for c in cells] + [bb | (2 << (4 * c)) for c in cells]
+        return {child: executor.submit(ai_solver.search, child, ai_solver.MAX_DEPTH, None, 1,
+                                       self.time_budget_ms)
+                for child in outcomes[:self.max_speculations]}
+
+    async def choose_move(self, board, speculations):
+        """The ai_solver.search result for board, from a speculation if one matches.
+
+        On a miss the search waits for speculations already running to
+        finish (queued ones are cancelled), so its time budget isn't spent
+        sharing the pool with searches whose result is thrown away.
+        """
+        bb = board_to_bitboard(board)
+        future = speculations.pop(bb, None)
+        running = [other for other in speculations.values() if not other.cancel()]
+        if future is not None:
+            self.speculation_hits += 1
+            return await asyncio.wrap_future(future)
+        loop = asyncio.get_running_loop()
+        if running:
+            await loop.run_in_executor(None, concurrent.futures.wait, running)
+        if self.executor is not None:
+            return await asyncio.wrap_future(self.executor.submit(
+                ai_solver.search, bb, ai_solver.MAX_DEPTH, None, 1, self.time_budget_ms))
+        return await loop.run_in_executor(None, self._search, board)
+
+    def _record(self, board, result, region):
+        stages = ('capture', 'recognize', 'search') + (('swipe',) if result['move'] else ())
+        timings = {stage: self.timings[stage][-1] for stage in stages}
+        self.trace.record(board, result['move'], result, timings, region if self.trace_roi else None)
+
+    # --- Main loop ---
+
+    async def run(self, max_moves=None):
+        loop = asyncio.get_running_loop()
+        self.started = time.perf_counter()
+        speculations = {}
+        previous = None
+
+        while max_moves is None or self.moves < max_moves:
+            captured = await self._timed('capture', self.capture_stable(previous))
+            if captured is None:
+                log.error("❌ Capture failed. Stopping.")
+                break
+            frame, previous = captured
+
+            start = time.perf_counter()
+            region = self._crop(frame)
+            board = self.tracker.observe(region)
+            elapsed = time.perf_counter() - start
+            self.timings['recognize'].append(elapsed * 1000.0)
+            instrumentation.observe('recognize', elapsed)
+
+            result = await self._timed('search', self.choose_move(board, speculations))
+            move = result['move']
+            if move is None:
+                if self.trace is not None:
+                    self._record(board, result, region)
+                log.warning("❌ No valid moves found by AI. Game likely over or stuck. Stopping.")
+                break
+
+            swipe_task = loop.create_task(self._timed('swipe', self.swipe(move)))
+            speculations = self.speculate(self.tracker.predict(move))
+            await swipe_task
+            if self.trace is not None:
+                self._record(board, result, region)
+            self.moves += 1
+            log.info(f"\U0001F916 {move.upper()}")
+            log.debug(f"{board}")
+
+        for future in speculations.values():
+            future.cancel()
+        return self.stats()
+
+    def stats(self):
+        elapsed = time.perf_counter() - self.started if self.started else 0.0
+        stages = {}
+        for stage, values in self.timings.items():
+            arr = np.array(values)
+            stages[stage] = {
+                'p50_ms': float(np.percentile(arr, 50)),
+                'p95_ms': float(np.percentile(arr, 95)),
+                'mean_ms': float(arr.mean()),
+            }
+        return {
+            'moves': self.moves,
+            'moves_per_minute': self.moves / elapsed * 60.0 if elapsed else 0.0,
+            'speculation_hits': self.speculation_hits,
+            'stages': stages,
+        }
@@ -0,0 +1 @@
+"""Game rules: the numpy reference (game_logic), bitboards and batched bitboard games."""
@@ -0,0 +1,135 @@
+import numpy as np
+
+from ai2048.engine import bitboard
+
+# --- Vectorized game engine ---
+# B games live in one contiguous uint64 array of bitboards (same layout as
+# bitboard.py). Moves are the bitboard row tables turned into NumPy arrays, so
+# a step is a few dozen array operations regardless of B.
+
+ACTIONS = bitboard.MOVES  # action i is ACTIONS[i]: 0=up, 1=down, 2=left, 3=right
+
+_U64 = np.uint64
+_ROW = _U64(0xFFFF)
+_NIBBLE_SHIFTS = np.arange(0, 64, 4, dtype=np.uint64)
+
+_LEFT = np.array(bitboard.ROW_LEFT, dtype=np.uint64)
+_RIGHT = np.array(bitboard.ROW_RIGHT, dtype=np.uint64)
+_UP = np.array(bitboard.COL_UP, dtype=np.uint64)
+_DOWN = np.array(bitboard.COL_DOWN, dtype=np.uint64)
+_SCORE = np.array(bitboard.ROW_SCORE, dtype=np.int64)
+
+
+def transpose_boards(bbs):
+    a = ((bbs & _U64(0xF0F00F0FF0F00F0F))
+         | ((bbs & _U64(0x0000F0F00000F0F0)) << _U64(12))
+         | ((bbs & _U64(0x0F0F00000F0F0000)) >> _U64(12)))
+    return ((a & _U64(0xFF00FF0000FF00FF))
+            | ((a & _U64(0x00FF00FF00000000)) >> _U64(24))
+            | ((a & _U64(0x00000000FF00FF00)) << _U64(24)))
+
+
+def all_moves(bbs):
+    """Returns (moved, rewards), both shaped (4, B), for every action on every board."""
+    rows = [((bbs >> _U64(s)) & _ROW).astype(np.intp) for s in (0, 16, 32, 48)]
+    cols = [((transpose_boards(bbs) >> _U64(s)) & _ROW).astype(np.intp) for s in (0, 16, 32, 48)]
+
+    moved = np.empty((4, len(bbs)), dtype=np.uint64)
+    moved[0] = bbs ^ _UP[cols[0]] ^ (_UP[cols[1]] << _U64(4)) ^ (_UP[cols[2]] << _U64(8)) ^ (_UP[cols[3]] << _U64(12))
+    moved[1] = bbs ^ _DOWN[cols[0]] ^ (_DOWN[cols[1]] << _U64(4)) ^ (_DOWN[cols[2]] << _U64(8)) ^ (_DOWN[cols[3]] << _U64(12))
+    moved[2] = bbs ^ _LEFT[rows[0]] ^ (_LEFT[rows[1]] << _U64(16)) ^ (_LEFT[rows[2]] << _U64(32)) ^ (_LEFT[rows[3]] << _U64(48))
+    moved[3] = bbs ^ _RIGHT[rows[0]] ^ (_RIGHT[rows[1]] << _U64(16)) ^ (_RIGHT[rows[2]] << _U64(32)) ^ (_RIGHT[rows[3]] << _U64(48))
+
+    row_score = _SCORE[rows[0]] + _SCORE[rows[1]] + _SCORE[rows[2]] + _SCORE[rows[3]]
+    col_score = _SCORE[cols[0]] + _SCORE[cols[1]] + _SCORE[cols[2]] + _SCORE[cols[3]]
+    rewards = np.stack([col_score, col_score, row_score, row_score])
+    return moved, rewards
+
+
+def spawn_tiles(bbs, rng, mask=None):
+    """Vectorized bitboard.spawn_random_tile over the boards selected by mask."""
+    nibbles = (bbs[:, None] >> _NIBBLE_SHIFTS) & _U64(0xF)
+    empty = nibbles == 0
+    n_empty = empty.sum(axis=1)
+    spawn = n_empty > 0
+    if mask is not None:
+        spawn &= mask
+
+    pick = (rng.random(len(bbs)) * n_empty).astype(np.int64)
+    cell = (empty.cumsum(axis=1) > pick[:, None]).argmax(axis=1)
+    rank = np.where(rng.random(len(bbs)) < 0.1, 2, 1).astype(np.uint64)
+    tile = rank << (_U64(4) * cell.astype(np.uint64))
+    return np.where(spawn, bbs | tile, bbs)
+
+
+class BatchGame:
+    """B independent 2048 games stepped together, env-style.
+
+    step(actions) applies one action per board, adds tiles to the boards that
+    changed, and resets finished games in place. Observations are the packed
+    uint64 boards; use to_arrays() for (B, 4, 4) tile values.
+    """
+
+    def __init__(self, batch_size, seed=None):
+        self.batch_size = batch_size
+        self.rng = np.random.default_rng(seed)
+        self.boards = np.zeros(batch_size, dtype=np.uint64)
+        self.scores = np.zeros(batch_size, dtype=np.int64)
+        self.moves = np.zeros(batch_size, dtype=np.int64)
+        self._moved = None
+        self._rewards = None
+        self.reset()
+
+    def reset(self, mask=None):
+        """Starts fresh games (two random tiles) for all boards, or just mask."""
+        if mask is None:
+            mask = np.ones(self.batch_size, dtype=bool)
+        fresh = np.zeros(self.batch_size, dtype=np.uint64)
+        fresh = spawn_tiles(spawn_tiles(fresh, self.rng), self.rng)
+        self.boards = np.where(mask, fresh, self.boards)
+        self.scores[mask] = 0
+        self.moves[mask] = 0
+        self._refresh_moves()
+        return self.boards
+
+    def _refresh_moves(self):
+        self._moved, self._rewards = all_moves(self.boards)
+
+    def legal_moves(self):
+        """(B, 4) bool array of actions that would change each board."""
+        return (self._moved != self.boards).T
+
+    def step(self, actions):
+        """Returns (boards, rewards, dones, info).
+
+        A no-op action leaves its board unchanged with zero reward and no new
+        tile (info['valid'] is False). A game is done when its board after the
+        spawn has no legal move; it is reset immediately and its final score
+        and move count are in info['final_scores'] / info['final_moves'].
+        """
+        actions = np.asarray(actions, dtype=np.intp)
+        idx = np.arange(self.batch_size)
+        moved = self._moved[actions, idx]
+        valid = moved != self.boards
+        rewards = np.where(valid, self._rewards[actions, idx], 0)
+
+        self.boards = spawn_tiles(moved, self.rng, valid)
+        self.scores += rewards
+        self.moves += valid
+        self._refresh_moves()
+
+        dones = (self._moved == self.boards).all(axis=0)
+        info = {
+            'valid': valid,
+            'final_scores': np.where(dones, self.scores, 0),
+            'final_moves': np.where(dones, self.moves, 0),
+            'final_boards': np.where(dones, self.boards, 0),
+        }
+        if dones.any():
+            self.reset(dones)
+        return self.boards, rewards, dones, info
+
+    def to_arrays(self):
+        """Current boards as a (B, 4, 4) array of tile values."""
+        ranks = ((self.boards[:, None] >> _NIBBLE_SHIFTS) & _U64(0xF)).astype(np.int64)
+        return np.where(ranks > 0, 1 << ranks, 0).reshape(-1, 4, 4)
@@ -0,0 +1,377 @@
+import os
+import random
+import sys
+import tempfile
+from array import array
+
+import numpy as np
+
+from ai2048.config import cache_dir
+
+# --- Bitboard layout ---
+# The whole 4x4 board lives in one 64-bit Python int. Each cell is a 4-bit
+# nibble holding the log2 of the tile (0 = empty, 1 = 2, 2 = 4, ... 15 = 32768).
+# Cell (r, c) sits at nibble 4*r + c, so row r is bits 16*r .. 16*r + 15 and
+# column 0 is the lowest nibble of each row.
+
+ROW_MASK = 0xFFFF
+COL_MASK = 0x000F000F000F000F
+MAX_RANK = 15
+
+MOVES = ('up', 'down', 'left', 'right')
+
+
+def _unpack_row(row):
+    return [(row >> 0) & 0xF, (row >> 4) & 0xF, (row >> 8) & 0xF, (row >> 12) & 0xF]
+
+
+def _pack_row(cells):
+    return cells[0] | (cells[1] << 4) | (cells[2] << 8) | (cells[3] << 12)
+
+
+def _reverse_row(row):
+    return ((row >> 12) & 0xF) | ((row >> 4) & 0xF0) | ((row << 4) & 0xF00) | ((row << 12) & 0xF000)
+
+
+def _unpack_col(row):
+    """Spreads a 16-bit row into column 0 of an otherwise empty board."""
+    return (row & 0xF) | ((row & 0xF0) << 12) | ((row & 0xF00) << 24) | ((row & 0xF000) << 36)
+
+
+def _slide_left(cells):
+    """Same merge rules as game_logic.move_left, on log2 ranks."""
+    tight = [c for c in cells if c != 0]
+    merged = []
+    score = 0
+    skip = False
+    for i in range(len(tight)):
+        if skip:
+            skip = False
+            continue
+        if i + 1 < len(tight) and tight[i] == tight[i + 1] and tight[i] < MAX_RANK:
+            merged.append(tight[i] + 1)
+            score += 1 << (tight[i] + 1)
+            skip = True
+        else:
+            merged.append(tight[i])
+    merged += [0] * (4 - len(merged))
+    return merged, score
+
+
+def _build_tables():
+    """Builds the 65536-entry row lookup tables (only when they are not cached)."""
+    row_left = [0] * 65536
+    row_right = [0] * 65536
+    col_up = [0] * 65536
+    col_down = [0] * 65536
+    row_score = [0] * 65536
+
+    for row in range(65536):
+        merged, score = _slide_left(_unpack_row(row))
+        result = _pack_row(merged)
+        rev_row = _reverse_row(row)
+        rev_result = _reverse_row(result)
+
+        row_score[row] = score
+        # Store XOR deltas so a move is just bb ^ table[row] << shift
+        row_left[row] = row ^ result
+        row_right[rev_row] = rev_row ^ rev_result
+        col_up[row] = _unpack_col(row) ^ _unpack_col(result)
+        col_down[rev_row] = _unpack_col(rev_row) ^ _unpack_col(rev_result)
+
+    return row_left, row_right, col_up, col_down, row_score
+
+
+def _shifted_tables():
+    """The five base tables plus the pre-shifted copies, 17 lists in all."""
+    row_left, row_right, col_up, col_down, row_score = _build_tables()
+    tables = [row_score]
+    # Pre-shifted copies so each row/column lookup is one index and one XOR
+    for table, shifts in ((row_left, (16, 32, 48)), (row_right, (16, 32, 48)),
+                          (col_up, (4, 8, 12)), (col_down, (4, 8, 12))):
+        tables.append(table)
+        tables += [[x << s for x in table] for s in shifts]
+    return tables
+
+
+# --- Table cache ---
+# Building the tables in pure Python is most of what importing the engine
+# costs (about 0.3 s, paid again by every pool worker), so they are cached on
+# disk as raw uint64s and read back with one array.frombytes (about 25 ms).
+
+CACHE_DIR = cache_dir()
+# Bump when _slide_left or the table layout changes
+TABLE_VERSION = 1
+_TABLE_COUNT = 17
+
+
+def table_path(cache_dir=None):
+    return os.path.join(cache_dir or CACHE_DIR, f"move_tables_v{TABLE_VERSION}_{sys.byteorder}.bin")
+
+
+def _load_or_build_tables():
+    if not CACHE_DIR:
+        return _shifted_tables()
+    path = table_path()
+    data = array('Q')
+    try:
+        with open(path, 'rb') as f:
+            data.frombytes(f.read())
+        if len(data) == _TABLE_COUNT * 65536:
+            return [data[i * 65536:(i + 1) * 65536].tolist() for i in range(_TABLE_COUNT)]
+    except (OSError, ValueError):
+        pass
+
+    tables = _shifted_tables()
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        # Write to a temp file and rename so a worker starting at the same
+        # time never reads a half-written cache
+        fd, tmp = tempfile.mkstemp(dir=CACHE_DIR, suffix='.bin')
+        with os.fdopen(fd, 'wb') as f:
+            for table in tables:
+                array('Q', table).tofile(f)
+        os.replace(tmp, path)
+    except OSError:
+        pass  # Read-only cache: keep the tables in memory
+    return tables
+
+
+_tables = _load_or_build_tables()
+ROW_SCORE = _tables[0]
+_LEFT, _RIGHT, _UP, _DOWN = _tables[1:5], _tables[5:9], _tables[9:13], _tables[13:17]
+ROW_LEFT, ROW_RIGHT, COL_UP, COL_DOWN = _LEFT[0], _RIGHT[0], _UP[0], _DOWN[0]
+del _tables
+
+
+# --- Conversion helpers ---
+
+def board_to_bitboard(board):
+    """Packs a 4x4 array of tile values (0, 2, 4, ...) into a bitboard int."""
+    bb = 0
+    shift = 0
+    for value in np.asarray(board).ravel():
+        value = int(value)
+        if value:
+            bb |= (value.bit_length() - 1) << shift
+        shift += 4
+    return bb
+
+
+def bitboard_to_board(bb):
+    """Unpacks a bitboard into a 4x4 int array of tile values."""
+    ranks = [(bb >> (4 * i)) & 0xF for i in range(16)]
+    return np.array([(1 << r) if r else 0 for r in ranks], dtype=int).reshape(4, 4)
+
+
+def transpose(bb):
+    """Mirrors the board across its main diagonal."""
+    a = (bb & 0xF0F00F0FF0F00F0F) | ((bb & 0x0000F0F00000F0F0) << 12) | ((bb & 0x0F0F00000F0F0000) >> 12)
+    return (a & 0xFF00FF0000FF00FF) | ((a & 0x00FF00FF00000000) >> 24) | ((a & 0x00000000FF00FF00) << 24)
+
+
+# --- Symmetry ---
+# The 8 rotations/reflections of the board (the dihedral group) play
+# identically up to relabelling the moves. Symmetry k is built by applying
+# transpose (k & 4), then flip_vertical (k & 2), then flip_horizontal (k & 1).
+
+def flip_horizontal(bb):
+    """Mirrors every row (left <-> right)."""
+    return (((bb & 0x000F000F000F000F) << 12) | ((bb & 0x00F000F000F000F0) << 4)
+            | ((bb & 0x0F000F000F000F00) >> 4) | ((bb & 0xF000F000F000F000) >> 12))
+
+
+def flip_vertical(bb):
+    """Mirrors the row order (top <-> bottom)."""
+    return (((bb & 0xFFFF) << 48) | ((bb & 0xFFFF0000) << 16)
+            | ((bb >> 16) & 0xFFFF0000) | (bb >> 48))
+
+
+def apply_symmetry(bb, sym):
+    if sym & 4:
+        bb = transpose(bb)
+    if sym & 2:
+        bb = flip_vertical(bb)
+    if sym & 1:
+        bb = flip_horizontal(bb)
+    return bb
+
+
+def symmetries(bb):
+    """All 8 symmetric variants of bb; entry k is apply_symmetry(bb, k)."""
+    t = transpose(bb)
+    v, tv = flip_vertical(bb), flip_vertical(t)
+    return (bb, flip_horizontal(bb), v, flip_horizontal(v),
+            t, flip_horizontal(t), tv, flip_horizontal(tv))
+
+
+def canonical_board(bb):
+    """Smallest of the 8 symmetric variants, the key shared by all of them."""
+    return min(symmetries(bb))
+
+
+def canonicalize(bb):
+    """Returns (canonical bitboard, sym) with apply_symmetry(bb, sym) == canonical."""
+    variants = symmetries(bb)
+    canon = min(variants)
+    return canon, variants.index(canon)
+
+
+def _symmetry_move_map(sym):
+    mapping = {m: m for m in MOVES}
+    steps = []
+    if sym & 4:
+        steps.append({'up': 'left', 'left': 'up', 'down': 'right', 'right': 'down'})
+    if sym & 2:
+        steps.append({'up': 'down', 'down': 'up'})
+    if sym & 1:
+        steps.append({'left': 'right', 'right': 'left'})
+    for step in steps:
+        mapping = {m: step.get(t, t) for m, t in mapping.items()}
+    return mapping
+
+
+# SYMMETRY_MOVES[sym][move] is the move on apply_symmetry(bb, sym) that
+# matches move on bb; INVERSE_SYMMETRY_MOVES maps back.
+SYMMETRY_MOVES = [_symmetry_move_map(sym) for sym in range(8)]
+INVERSE_SYMMETRY_MOVES = [{t: m for m, t in mapping.items()} for mapping in SYMMETRY_MOVES]
+
+
+# --- Moves ---
+
+def move_left(bb, t0=_LEFT[0], t1=_LEFT[1], t2=_LEFT[2], t3=_LEFT[3]):
+    return bb ^ t0[bb & 0xFFFF] ^ t1[(bb >> 16) & 0xFFFF] ^ t2[(bb >> 32) & 0xFFFF] ^ t3[bb >> 48]
+
+
+def move_right(bb, t0=_RIGHT[0], t1=_RIGHT[1], t2=_RIGHT[2], t3=_RIGHT[3]):
+    return bb ^ t0[bb & 0xFFFF] ^ t1[(bb >> 16) & 0xFFFF] ^ t2[(bb >> 32) & 0xFFFF] ^ t3[bb >> 48]
+
+
+def move_up(bb, t0=_UP[0], t1=_UP[1], t2=_UP[2], t3=_UP[3]):
+    a = (bb & 0xF0F00F0FF0F00F0F) | ((bb & 0x0000F0F00000F0F0) << 12) | ((bb & 0x0F0F00000F0F0000) >> 12)
+    t = (a & 0xFF00FF0000FF00FF) | ((a & 0x00FF00FF00000000) >> 24) | ((a & 0x00000000FF00FF00) << 24)
+    return bb ^ t0[t & 0xFFFF] ^ t1[(t >> 16) & 0xFFFF] ^ t2[(t >> 32) & 0xFFFF] ^ t3[t >> 48]
+
+
+def move_down(bb, t0=_DOWN[0], t1=_DOWN[1], t2=_DOWN[2], t3=_DOWN[3]):
+    a = (bb & 0xF0F00F0FF0F00F0F) | ((bb & 0x0000F0F00000F0F0) << 12) | ((bb & 0x0F0F00000F0F0000) >> 12)
+    t = (a & 0xFF00FF0000FF00FF) | ((a & 0x00FF00FF00000000) >> 24) | ((a & 0x00000000FF00FF00) << 24)
+    return bb ^ t0[t & 0xFFFF] ^ t1[(t >> 16) & 0xFFFF] ^ t2[(t >> 32) & 0xFFFF] ^ t3[t >> 48]
+
+
+def all_moves(bb, l=_LEFT, r=_RIGHT, u=_UP, d=_DOWN):
+    """Yields (direction, new_bb) for every move that changes the board.
+
+    Shares one transpose between up and down, which is what the search wants
+    at every max node.
+    """
+    r0, r1, r2, r3 = bb & 0xFFFF, (bb >> 16) & 0xFFFF, (bb >> 32) & 0xFFFF, bb >> 48
+    a = (bb & 0xF0F00F0FF0F00F0F) | ((bb & 0x0000F0F00000F0F0) << 12) | ((bb & 0x0F0F00000F0F0000) >> 12)
+    t = (a & 0xFF00FF0000FF00FF) | ((a & 0x00FF00FF00000000) >> 24) | ((a & 0x00000000FF00FF00) << 24)
+    c0, c1, c2, c3 = t & 0xFFFF, (t >> 16) & 0xFFFF, (t >> 32) & 0xFFFF, t >> 48
+
+    delta = u[0][c0] ^ u[1][c1] ^ u[2][c2] ^ u[3][c3]
+    if delta:
+        yield 'up', bb ^ delta
+    delta = d[0][c0] ^ d[1][c1] ^ d[2][c2] ^ d[3][c3]
+    if delta:
+        yield 'down', bb ^ delta
+    delta = l[0][r0] ^ l[1][r1] ^ l[2][r2] ^ l[3][r3]
+    if delta:
+        yield 'left', bb ^ delta
+    delta = r[0][r0] ^ r[1][r1] ^ r[2][r2] ^ r[3][r3]
+    if delta:
+        yield 'right', bb ^ delta
+
+
+def row_scores(bb):
+    """Merge score gained by sliding every row of bb left (or right)."""
+    return (ROW_SCORE[bb & ROW_MASK] + ROW_SCORE[(bb >> 16) & ROW_MASK]
+            + ROW_SCORE[(bb >> 32) & ROW_MASK] + ROW_SCORE[(bb >> 48) & ROW_MASK])
+
+
+def execute_move(bb, direction, l=_LEFT, r=_RIGHT, u=_UP, d=_DOWN, score=ROW_SCORE):
+    """Returns (new_bb, score) for 'up', 'down', 'left' or 'right'.
+
+    The move and its score index the same four lines, so up and down
+    transpose the board once for both.
+    """
+    if direction == 'left' or direction == 'right':
+        x0, x1, x2, x3 = bb & 0xFFFF, (bb >> 16) & 0xFFFF, (bb >> 32) & 0xFFFF, bb >> 48
+        t0, t1, t2, t3 = l if direction == 'left' else r
+    elif direction == 'up' or direction == 'down':
+        a = (bb & 0xF0F00F0FF0F00F0F) | ((bb & 0x0000F0F00000F0F0) << 12) | ((bb & 0x0F0F00000F0F0000) >> 12)
+        t = (a & 0xFF00FF0000FF00FF) | ((a & 0x00FF00FF00000000) >> 24) | ((a & 0x00000000FF00FF00) << 24)
+        x0, x1, x2, x3 = t & 0xFFFF, (t >> 16) & 0xFFFF, (t >> 32) & 0xFFFF, t >> 48
+        t0, t1, t2, t3 = u if direction == 'up' else d
+    else:
+        raise ValueError(f"Invalid direction: {direction}")
+    return bb ^ t0[x0] ^ t1[x1] ^ t2[x2] ^ t3[x3], score[x0] + score[x1] + score[x2] + score[x3]
+
+
+MOVE_FUNCTIONS = {
+    'up': move_up,
+    'down': move_down,
+    'left': move_left,
+    'right': move_right,
+}
+
+
+# --- Board queries ---
+
+def empty_cells(bb):
+    """Nibble indexes (4*r + c) of all empty cells."""
+    return [i for i in range(16) if not (bb >> (4 * i)) & 0xF]
+
+
+def count_empty(bb):
+    # Fold every nibble down to a single "occupied" bit, then count the zeros
+    x = bb | (bb >> 2)
+    x |= x >> 1
+    x &= 0x1111111111111111
+    return 16 - bin(x).count('1')
+
+
+def max_rank(bb):
+    best = 0
+    while bb:
+        r = bb & 0xF
+        if r > best:
+            best = r
+        bb >>= 4
+    return best
+
+
+def count_distinct_tiles(bb):
+    """Number of different tile values on the board."""
+    seen = 0
+    while bb:
+        seen |= 1 << (bb & 0xF)
+        bb >>= 4
+    return bin(seen & ~1).count('1')
+
+
+def is_game_over(bb):
+    for move in (move_left, move_right, move_up, move_down):
+        if move(bb) != bb:
+            return False
+    return True
+
+
+def spawn_random_tile(bb, rng=random):
+    """Bitboard twin of game_logic.spawn_random_tile (90% '2', 10% '4')."""
+    empty = empty_cells(bb)
+    if not empty:
+        return bb
+    cell = rng.choice(empty)
+    rank = 2 if rng.random() < 0.1 else 1
+    return bb | (rank << (4 * cell))
+
+
+# --- Array API ---
+# Drop-in versions of the game_logic moves for code that still passes
+# numpy boards around (play_game.py, the autoplay scripts).
+
+def move_board(board, direction):
+    bb, score = execute_move(board_to_bitboard(board), direction)
+    return bitboard_to_board(bb), score
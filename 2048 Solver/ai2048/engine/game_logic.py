@@ -1,4 +1,4 @@
-﻿import numpy as np
+import numpy as np
 import random
  
 def move_left(board):
@@ -0,0 +1,162 @@
+import io
+import json
+import sys
+import time
+
+# --- Lightweight instrumentation ---
+# Timers, counters and gauges for the autoplay loop and the solver. When
+# disabled, timer() hands back one shared no-op context manager and count()
+# returns after a single flag check, so the calls can stay in the hot path.
+# Enable with enable(); the play command does so for the `metrics` setting
+# (metrics = true, or AI2048_METRICS=true in the environment).
+
+ENABLED = False
+
+_timers = {}    # name -> [count, total_s, max_s]
+_counters = {}  # name -> int
+_gauges = {}    # name -> float
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, time.perf_counter() - self.start)
+        return False
+
+
+def enable(flag=True):
+    global ENABLED
+    ENABLED = flag
+
+
+def reset():
+    _timers.clear()
+    _counters.clear()
+    _gauges.clear()
+
+
+def timer(name):
+    """Context manager timing one stage: `with timer('capture'): ...`."""
+    if not ENABLED:
+        return _NULL_TIMER
+    return _Timer(name)
+
+
+def observe(name, seconds):
+    """Records a duration measured elsewhere."""
+    if not ENABLED:
+        return
+    entry = _timers.get(name)
+    if entry is None:
+        _timers[name] = [1, seconds, seconds]
+    else:
+        entry[0] += 1
+        entry[1] += seconds
+        if seconds > entry[2]:
+            entry[2] = seconds
+
+
+def count(name, n=1):
+    if ENABLED:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def gauge(name, value):
+    if ENABLED:
+        _gauges[name] = value
+
+
+def snapshot():
+    return {
+        'timers': {name: {'count': c, 'total_ms': total * 1000.0, 'mean_ms': total / c * 1000.0,
+                          'max_ms': peak * 1000.0}
+                   for name, (c, total, peak) in _timers.items()},
+        'counters': dict(_counters),
+        'gauges': dict(_gauges),
+    }
+
+
+def write_json_line(stream=None, **extra):
+    """Writes the current snapshot (plus extra fields) as one JSON line."""
+    record = {'ts': time.time(), **extra, **snapshot()}
+    (stream or sys.stdout).write(json.dumps(record) + '\n')
+
+
+def _metric_name(prefix, name):
+    return f"{prefix}_{name}".replace('.', '_').replace('-', '_')
+
+
+def prometheus_text(prefix='autoplay'):
+    """Current metrics in the Prometheus text exposition format."""
+    lines = []
+    if _timers:
+        metric = f"{prefix}_stage_seconds"
+        lines.append(f"# TYPE {metric} summary")
+        for name, (c, total, _) in sorted(_timers.items()):
+            lines.append(f'{metric}_count{{stage="{name}"}} {c}')
+            lines.append(f'{metric}_sum{{stage="{name}"}} {total:.6f}')
+        lines.append(f"# TYPE {prefix}_stage_max_seconds gauge")
+        for name, (_, _, peak) in sorted(_timers.items()):
+            lines.append(f'{prefix}_stage_max_seconds{{stage="{name}"}} {peak:.6f}')
+    for name, value in sorted(_counters.items()):
+        metric = _metric_name(prefix, name) + '_total'
+        lines.append(f"# TYPE {metric} counter")
+        lines.append(f"{metric} {value}")
+    for name, value in sorted(_gauges.items()):
+        metric = _metric_name(prefix, name)
+        lines.append(f"# TYPE {metric} gauge")
+        lines.append(f"{metric} {value}")
+    return '\n'.join(lines) + '\n'
+
+
+def profile_call(fn, *args, tool='cprofile', limit=25, **kwargs):
+    """Runs fn(*args, **kwargs) once under a profiler and prints the report.
+
+    tool='pyinstrument' uses pyinstrument if it is installed, otherwise the
+    call falls back to cProfile.
+    """
+    if tool == 'pyinstrument':
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            print("⚠️ pyinstrument is not installed, using cProfile.")
+        else:
+            profiler = Profiler()
+            profiler.start()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                profiler.stop()
+                print(profiler.output_text(unicode=True, color=False))
+
+    import cProfile
+    import pstats
+
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(fn, *args, **kwargs)
+    finally:
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(limit)
+        print(out.getvalue())
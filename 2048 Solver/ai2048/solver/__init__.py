@@ -0,0 +1 @@
+"""Expectimax search, board evaluators (heuristic, n-tuple), transposition table and move book."""
@@ -0,0 +1,516 @@
+import os
+import time
+
+from ai2048 import instrumentation
+from ai2048.engine.bitboard import board_to_bitboard, all_moves, empty_cells, canonical_board, count_distinct_tiles
+from ai2048.solver.heuristic import HEURISTIC_WEIGHTS, evaluate_board, evaluate_boards, line_table
+from ai2048.solver.move_book import MoveBook
+from ai2048.solver.transposition_table import TranspositionTable, make_key
+
+# --- Search configuration ---
+# MAX_DEPTH is the number of player moves the search looks ahead. Each extra
+# level multiplies the work by roughly (4 moves x 2 tiles x empty cells).
+MAX_DEPTH = 3
+
+# Deepest level iterative deepening will try when given a time budget
+MAX_ITERATIVE_DEPTH = 8
+
+# Chance node probabilities for a newly spawned tile (game_logic.spawn_random_tile)
+PROB_2 = 0.9
+PROB_4 = 0.1
+
+# --- Chance node pruning ---
+# All off by default, which gives the exhaustive search. simulate.py
+# --compare measures nodes/move and win rate against it. Pool workers get the
+# current values (and USE_SYMMETRY) when they start, and get_executor
+# restarts the pool when they have changed since.
+# Chance nodes reached with a cumulative spawn probability below this are
+# scored by the heuristic instead of searched (e.g. 1e-4)
+PROB_CUTOFF = 0.0
+# Search at most this many empty cells per chance node, spread evenly over
+# the empty cells in board order (None = all of them)
+SPAWN_SAMPLES = None
+# Without a time budget, search max(depth, distinct tile values - this)
+# moves deep, so cluttered late-game boards get more lookahead (None = off)
+ADAPTIVE_DEPTH_OFFSET = None
+# Upper bound for the adaptive depth
+MAX_ADAPTIVE_DEPTH = 6
+
+# Search chance nodes on the canonical (smallest) of the board's 8
+# rotations/reflections. The heuristic is symmetric, so all 8 have the same
+# value and share one transposition table entry.
+USE_SYMMETRY = True
+
+# Worker processes for best_move. 1 keeps the search in-process; the pool is
+# only started the first time a parallel search is requested.
+SEARCH_WORKERS = 1
+
+# Score the leaves under each last-ply chance node in one NumPy pass
+BATCH_LEAVES = True
+
+# Work counters for instrumentation (cumulative, per process)
+nodes_expanded = 0
+leaves_evaluated = 0
+
+# Transposition table shared by consecutive best_move calls in one game
+TRANSPOSITION_TABLE = TranspositionTable()
+# HEURISTIC_WEIGHTS the table's values were computed with
+_table_weights = None
+
+# Precomputed moves consulted before searching (see build_move_book.py)
+MOVE_BOOK = None
+# File MOVE_BOOK was opened from; pool workers open the same one
+MOVE_BOOK_PATH = None
+
+# Leaf evaluator: any object with evaluate_board(bb) and evaluate_boards(bbs),
+# such as a trained ntuple.NTupleNetwork. None uses the heuristic. It must be
+# symmetric when USE_SYMMETRY is on; change it with set_evaluator.
+EVALUATOR = None
+# Checkpoint EVALUATOR was loaded from; pool workers load the same one
+EVALUATOR_PATH = None
+
+
+def load_move_book(path):
+    """Opens the move book at path for best_move, or closes it if path is None.
+
+    Pool workers started afterwards open the same book, so searches submitted
+    to the pool (the pipeline's and the fleet's) use it too.
+    """
+    global MOVE_BOOK, MOVE_BOOK_PATH
+    if MOVE_BOOK is not None:
+        MOVE_BOOK.close()
+    MOVE_BOOK = MoveBook(path) if path else None
+    MOVE_BOOK_PATH = path
+    return MOVE_BOOK
+
+
+def set_evaluator(evaluator):
+    """Scores leaves with evaluator (None = heuristic) and drops cached values.
+
+    A pool started before this keeps the old evaluator, and a pool started
+    after it only sees the new one on platforms that fork; use
+    load_evaluator for parallel search.
+    """
+    global EVALUATOR, EVALUATOR_PATH
+    EVALUATOR = evaluator
+    EVALUATOR_PATH = None
+    TRANSPOSITION_TABLE.clear()
+
+
+def load_evaluator(path):
+    """Loads an n-tuple checkpoint (memory-mapped) as the evaluator, or the heuristic if path is None."""
+    global EVALUATOR_PATH
+    if path != EVALUATOR_PATH and _executor is not None:
+        shutdown_executor()  # Restarted workers load the new checkpoint
+    if path:
+        from ai2048.solver.ntuple import NTupleNetwork  # Only needed with a checkpoint
+        set_evaluator(NTupleNetwork.load(path))
+    else:
+        set_evaluator(None)
+    EVALUATOR_PATH = path
+    return EVALUATOR
+
+
+def leaf_value(bb):
+    return evaluate_board(bb) if EVALUATOR is None else EVALUATOR.evaluate_board(bb)
+
+
+def leaf_values(bbs):
+    return evaluate_boards(bbs) if EVALUATOR is None else EVALUATOR.evaluate_boards(bbs)
+
+
+# --- Batched leaf evaluation ---
+# All leaves under a last-ply chance node are scored with one leaf_values
+# call instead of one leaf_value each.
+
+def _last_ply_value(bb, cells):
+    """expectimax(bb, 1) over the spawn cells with all leaves scored in one batch."""
+    global leaves_evaluated
+    leaves = []
+    counts = []
+    for cell in cells:
+        shift = 4 * cell
+        for tile in (1 << shift, 2 << shift):
+            before = len(leaves)
+            leaves.extend(moved for _, moved in all_moves(bb | tile))
+            counts.append(len(leaves) - before)
+
+    values = leaf_values(leaves).tolist() if leaves else []
+    leaves_evaluated += len(leaves)
+    total = 0.0
+    pos = 0
+    for i, count in enumerate(counts):
+        best = 0.0
+        for value in values[pos:pos + count]:
+            if value > best:
+                best = value
+        pos += count
+        total += (PROB_2 if i % 2 == 0 else PROB_4) * best
+    return total / len(cells)
+
+
+# --- Expectimax ---
+
+class SearchTimeout(Exception):
+    """Raised inside the search once the per-move deadline has passed."""
+
+
+# time.monotonic() value after which expectimax aborts, or None for no limit
+_deadline = None
+
+
+def spawn_cells(empty):
+    """The empty cells a chance node searches, at most SPAWN_SAMPLES of them."""
+    n = len(empty)
+    if SPAWN_SAMPLES is None or n <= SPAWN_SAMPLES:
+        return empty
+    return [empty[i * n // SPAWN_SAMPLES] for i in range(SPAWN_SAMPLES)]
+
+
+def adaptive_depth(bb, depth=MAX_DEPTH):
+    """Search depth for bb when ADAPTIVE_DEPTH_OFFSET is set."""
+    if ADAPTIVE_DEPTH_OFFSET is None:
+        return depth
+    return max(depth, min(MAX_ADAPTIVE_DEPTH, count_distinct_tiles(bb) - ADAPTIVE_DEPTH_OFFSET))
+
+
+def _max_value(bb, depth, table, prob=1.0):
+    """Best value the player can reach from bb with depth moves left."""
+    best = 0.0  # No legal move: game over
+    for _, moved in all_moves(bb):
+        value = expectimax(moved, depth - 1, table, prob)
+        if value > best:
+            best = value
+    return best
+
+
+def expectimax(bb, depth, table=None, prob=1.0):
+    """Expected value of bb right after a move, before the random tile spawns.
+
+    depth is the number of player moves still to search after the spawn and
+    prob the probability of the spawns that led here, for PROB_CUTOFF. Pruned
+    values are cached like exact ones, so with pruning on the result depends
+    on which path reached a position first.
+    """
+    global nodes_expanded
+    if depth == 0 or prob < PROB_CUTOFF:
+        return leaf_value(bb)
+    if _deadline is not None and time.monotonic() > _deadline:
+        raise SearchTimeout()
+    if table is None:
+        table = TRANSPOSITION_TABLE
+    if USE_SYMMETRY:
+        bb = canonical_board(bb)
+
+    key = make_key(bb, depth)
+    value = table.get(key)
+    if value is not None:
+        return value
+
+    nodes_expanded += 1
+    empty = empty_cells(bb)
+    if not empty:
+        value = _max_value(bb, depth, table, prob)
+    elif depth == 1 and BATCH_LEAVES:
+        value = _last_ply_value(bb, spawn_cells(empty))
+    else:
+        cells = spawn_cells(empty)
+        prob_2 = prob * PROB_2 / len(empty)
+        prob_4 = prob * PROB_4 / len(empty)
+        total = 0.0
+        for cell in cells:
+            shift = 4 * cell
+            total += PROB_2 * _max_value(bb | (1 << shift), depth, table, prob_2)
+            total += PROB_4 * _max_value(bb | (2 << shift), depth, table, prob_4)
+        value = total / len(cells)
+
+    table.put(key, value)
+    return value
+
+
+def score_moves(bb, depth=MAX_DEPTH, table=None, order=None, scores=None):
+    """Returns {direction: expected value} for every legal move from bb.
+
+    order lists directions to search first. Results are written into scores
+    as each move finishes, so a caller that catches SearchTimeout keeps the
+    moves that completed.
+    """
+    global _table_weights
+    if table is None:
+        table = TRANSPOSITION_TABLE
+    weights = tuple(HEURISTIC_WEIGHTS.items())
+    if weights != _table_weights:
+        table.clear()  # Values stored under the old weights are stale
+        _table_weights = weights
+    if scores is None:
+        scores = {}
+    moves = list(all_moves(bb))
+    if order:
+        moves.sort(key=lambda item: order.index(item[0]) if item[0] in order else len(order))
+    for move, moved in moves:
+        scores[move] = expectimax(moved, depth - 1, table)
+    return scores
+
+
+# --- Parallel search ---
+# The pool is created once and reused across turns. Boards cross the process
+# boundary as plain ints, and each worker keeps its own TRANSPOSITION_TABLE.
+
+_executor = None
+_executor_workers = 0
+_executor_config = None
+
+# Module settings a worker must share with this process to search the same
+# tree. They are passed to each worker explicitly, because under the spawn
+# start method (macOS, Windows) workers re-import the module defaults.
+# HEURISTIC_WEIGHTS is edited in place, so it is compared and sent as a copy
+# and copied back into the worker's own dict.
+POOL_SETTINGS = ('PROB_2', 'PROB_4', 'PROB_CUTOFF', 'SPAWN_SAMPLES', 'ADAPTIVE_DEPTH_OFFSET',
+                 'MAX_ADAPTIVE_DEPTH', 'USE_SYMMETRY', 'BATCH_LEAVES', 'HEURISTIC_WEIGHTS')
+
+
+def _pool_config():
+    settings = tuple((name, globals()[name]) for name in POOL_SETTINGS)
+    settings = tuple((name, dict(value) if isinstance(value, dict) else value) for name, value in settings)
+    return EVALUATOR_PATH, MOVE_BOOK_PATH, settings
+
+
+def _init_worker(evaluator_path, move_book_path, settings):
+    for name, value in settings:
+        if isinstance(value, dict):
+            globals()[name].update(value)  # heuristic's defaults point at this dict
+        else:
+            globals()[name] = value
+    if evaluator_path:
+        load_evaluator(evaluator_path)
+    if move_book_path:
+        load_move_book(move_book_path)
+
+
+def _warm_up(_):
+    # Importing this module built the move tables; build the leaf table too
+    line_table()
+    return os.getpid()
+
+
+def _worker_expectimax(bb, depth, deadline=None):
+    global _deadline
+    _deadline = deadline
+    try:
+        return expectimax(bb, depth)
+    finally:
+        _deadline = None
+
+
+def _worker_max_value(bb, depth, deadline=None, prob=1.0):
+    global _deadline
+    _deadline = deadline
+    try:
+        return _max_value(bb, depth, TRANSPOSITION_TABLE, prob)
+    finally:
+        _deadline = None
+
+
+def get_executor(workers=None):
+    """Returns the shared process pool, starting and warming it on first use.
+
+    The pool is restarted when the worker count, the evaluator checkpoint,
+    the move book or any of POOL_SETTINGS changed since it was started.
+    """
+    global _executor, _executor_workers, _executor_config
+    workers = workers or SEARCH_WORKERS
+    config = _pool_config()
+    if _executor is None or _executor_workers != workers or _executor_config != config:
+        from concurrent.futures import ProcessPoolExecutor  # Single-core play never starts a pool
+        shutdown_executor()
+        _executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=config)
+        _executor_workers = workers
+        _executor_config = config
+        list(_executor.map(_warm_up, range(workers)))
+    return _executor
+
+
+def shutdown_executor():
+    global _executor, _executor_workers, _executor_config
+    if _executor is not None:
+        _executor.shutdown()
+        _executor = None
+        _executor_workers = 0
+        _executor_config = None
+
+
+def score_moves_parallel(bb, depth=MAX_DEPTH, workers=None, split='chance', deadline=None, order=None,
+                         scores=None):
+    """Parallel score_moves returning exactly the same values.
+
+    split='moves' sends each root move to a worker. split='chance' goes one
+    level further and sends every (cell, tile) spawn under every root move,
+    which keeps more cores busy; the parent then sums the children in the
+    same order expectimax does so the floats match bit for bit.
+
+    deadline is a time.monotonic() value shared with the workers; past it the
+    search raises SearchTimeout. As in score_moves, order lists directions to
+    search first and scores receives every move that finished; on a timeout
+    the work still queued is cancelled so it does not hold up the pool after
+    the move has been chosen.
+    """
+    from concurrent.futures import CancelledError
+
+    executor = get_executor(workers)
+    if scores is None:
+        scores = {}
+    moves = list(all_moves(bb))
+    if order:
+        moves.sort(key=lambda item: order.index(item[0]) if item[0] in order else len(order))
+    if split not in ('moves', 'chance'):
+        raise ValueError(f"Unknown split: {split}")
+
+    jobs = []
+    for move, moved in moves:
+        if split == 'moves' or depth < 2:
+            jobs.append((move, None, [executor.submit(_worker_expectimax, moved, depth - 1, deadline)]))
+            continue
+        if USE_SYMMETRY:
+            moved = canonical_board(moved)  # Split the same children expectimax would
+        empty = empty_cells(moved)
+        if not empty:
+            jobs.append((move, None, [executor.submit(_worker_expectimax, moved, depth - 1, deadline)]))
+            continue
+        cells = spawn_cells(empty)
+        prob_2 = PROB_2 / len(empty)
+        prob_4 = PROB_4 / len(empty)
+        children = []
+        for cell in cells:
+            shift = 4 * cell
+            children.append(executor.submit(_worker_max_value, moved | (1 << shift), depth - 1,
+                                            deadline, prob_2))
+            children.append(executor.submit(_worker_max_value, moved | (2 << shift), depth - 1,
+                                            deadline, prob_4))
+        jobs.append((move, len(cells), children))
+
+    timed_out = False
+    for move, n_cells, children in jobs:
+        try:
+            if n_cells is None:
+                value = children[0].result()
+            else:
+                total = 0.0
+                for i in range(0, len(children), 2):
+                    total += PROB_2 * children[i].result()
+                    total += PROB_4 * children[i + 1].result()
+                value = total / n_cells
+        except (SearchTimeout, CancelledError):
+            if not timed_out:
+                timed_out = True
+                for _, _, others in jobs:
+                    for future in others:
+                        future.cancel()
+            continue  # Children that already finished may still complete other moves
+        scores[move] = value
+    if timed_out:
+        raise SearchTimeout()
+    return scores
+
+
+# --- Iterative deepening ---
+
+def iterative_deepening(bb, time_budget_ms, max_depth=MAX_ITERATIVE_DEPTH, table=None, workers=1):
+    """Searches one ply deeper at a time until the time budget runs out.
+
+    Each iteration searches the moves in the order the previous one ranked
+    them. Returns (scores, depth, partial) for the deepest usable iteration,
+    depth being the one every returned score was searched to. If the deadline
+    hits part way through an iteration, the moves that finished at the new
+    depth are kept as long as they include the previous best move, since they
+    were all scored at the same depth; partial is then True, as the other
+    moves were not compared. Depth 1 always completes.
+    """
+    global _deadline
+    deadline = time.monotonic() + time_budget_ms / 1000.0
+    scores = score_moves(bb, 1, table)
+    depth_reached = 1
+    incomplete = False
+
+    for depth in range(2, max_depth + 1):
+        if not scores or time.monotonic() > deadline:
+            break
+        order = sorted(scores, key=scores.get, reverse=True)
+        partial = {}
+        try:
+            if workers > 1:
+                score_moves_parallel(bb, depth, workers, deadline=deadline, order=order, scores=partial)
+            else:
+                _deadline = deadline
+                score_moves(bb, depth, table, order=order, scores=partial)
+        except SearchTimeout:
+            if order[0] in partial:
+                scores = partial
+                depth_reached = depth
+                incomplete = True
+            break
+        finally:
+            _deadline = None
+        scores = partial
+        depth_reached = depth
+
+    return scores, depth_reached, incomplete
+
+
+def search(board, depth=MAX_DEPTH, table=None, workers=None, time_budget_ms=None):
+    """best_move plus how the move was found.
+
+    Returns {'move', 'value', 'depth', 'nodes', 'leaves', 'book', 'partial'}:
+    the move (None if stuck), its expected value, the depth searched, the
+    nodes and leaves this process expanded (pool workers' work is not
+    included), whether the move came from MOVE_BOOK and whether the time
+    budget ran out before every move was searched to that depth.
+    """
+    bb = board if isinstance(board, int) else board_to_bitboard(board)
+    if MOVE_BOOK is not None:
+        hit = MOVE_BOOK.lookup(bb)
+        if hit is not None:
+            instrumentation.count('search.book_hits')
+            return {'move': hit[0], 'value': hit[1], 'depth': 0, 'nodes': 0, 'leaves': 0, 'book': True,
+                    'partial': False}
+    workers = workers or SEARCH_WORKERS
+    if (os.cpu_count() or 1) < 2:
+        workers = 1
+    stats_table = table or TRANSPOSITION_TABLE
+    before = (nodes_expanded, leaves_evaluated, stats_table.hits, stats_table.misses)
+    if instrumentation.ENABLED:
+        start = time.perf_counter()
+
+    partial = False
+    if time_budget_ms is not None:
+        scores, depth, partial = iterative_deepening(bb, time_budget_ms, table=table, workers=workers)
+    elif workers > 1:
+        depth = adaptive_depth(bb, depth)
+        scores = score_moves_parallel(bb, depth, workers)
+    else:
+        depth = adaptive_depth(bb, depth)
+        scores = score_moves(bb, depth, table)
+
+    nodes = nodes_expanded - before[0]
+    leaves = leaves_evaluated - before[1]
+    if instrumentation.ENABLED:
+        # Work done inside pool workers is not visible from this process
+        instrumentation.observe('search', time.perf_counter() - start)
+        instrumentation.count('search.nodes', nodes)
+        instrumentation.count('search.leaves', leaves)
+        instrumentation.count('search.cache_hits', stats_table.hits - before[2])
+        instrumentation.count('search.cache_misses', stats_table.misses - before[3])
+        instrumentation.gauge('search.depth', depth)
+    move = max(scores, key=scores.get) if scores else None
+    return {'move': move, 'value': scores[move] if move else 0.0, 'depth': depth, 'nodes': nodes,
+            'leaves': leaves, 'book': False, 'partial': partial}
+
+
+def best_move(board, depth=MAX_DEPTH, table=None, workers=None, time_budget_ms=None):
+    """Picks 'up', 'down', 'left' or 'right' for a 4x4 board, or None if stuck.
+
+    workers > 1 fans the root of the search out to the shared process pool;
+    the chosen move is the same as the serial search. With time_budget_ms the
+    fixed depth is replaced by iterative deepening against that deadline.
+    Positions found in MOVE_BOOK are answered from the book without searching.
+    """
+    return search(board, depth, table, workers, time_budget_ms)['move']
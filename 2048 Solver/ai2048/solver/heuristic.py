@@ -0,0 +1,198 @@
+import hashlib
+import os
+import tempfile
+
+import numpy as np
+
+from ai2048.config import cache_dir
+from ai2048.engine.bitboard import board_to_bitboard, transpose, max_rank
+
+# --- Board heuristic ---
+# Every term except the corner bonus is a sum over the 4 rows and 4 columns,
+# so each possible 16-bit line is scored once into a 65536-entry table and a
+# board is 8 table lookups (4 rows + 4 transposed columns) plus the corner
+# bonus. Tables are built once per weight configuration and cached on disk as
+# .npy files named after a hash of the weights, so a process only pays the
+# build the first time it sees a new set of weights, and loads it with mmap.
+
+HEURISTIC_WEIGHTS = {
+    'lost_penalty': 200000.0,  # Base score per line; a dead board scores 0
+    'empty': 270.0,            # Bonus per empty cell
+    'merges': 700.0,           # Bonus per pair of equal neighbours
+    'monotonicity': 47.0,      # Penalty for lines that are not monotonic
+    'smoothness': 10.0,        # Penalty for rank jumps between neighbours
+    'sum': 11.0,               # Penalty for large tiles spread over the board
+    'corner': 1000.0,          # Bonus per max-tile rank when it sits in a corner
+}
+
+# Where built tables are cached; '' keeps them in memory only
+CACHE_DIR = cache_dir()
+
+# Bump when line_heuristic changes so stale cached tables are not reused
+TABLE_VERSION = 1
+
+_U64 = np.uint64
+_NIBBLE_SHIFTS = np.arange(0, 64, 4, dtype=np.uint64)
+_CORNER_NIBBLES = [0, 3, 12, 15]
+_line_tables = {}  # weights key -> (float64 array, same values as a list)
+# id(weights) -> (weights, copy of them when last seen, array, list). A leaf
+# only compares the dict with its copy to notice a change, instead of sorting
+# it into a key; holding the dict keeps its id from being reused.
+_tables_by_id = {}
+
+
+def line_heuristic(line, weights=HEURISTIC_WEIGHTS):
+    """Scores one row or column given as 4 log2 ranks."""
+    empty = 0
+    merges = 0
+    smoothness = 0
+    total = 0.0
+    prev = 0
+    counter = 0
+    for rank in line:
+        total += rank ** 3.5
+        if rank == 0:
+            empty += 1
+            continue
+        if prev == rank:
+            counter += 1
+        elif counter > 0:
+            merges += 1 + counter
+            counter = 0
+        if prev:
+            smoothness += abs(prev - rank)
+        prev = rank
+    if counter > 0:
+        merges += 1 + counter
+
+    mono_left = 0
+    mono_right = 0
+    for i in range(1, 4):
+        if line[i - 1] > line[i]:
+            mono_left += line[i - 1] ** 4 - line[i] ** 4
+        else:
+            mono_right += line[i] ** 4 - line[i - 1] ** 4
+
+    return (weights['lost_penalty']
+            + weights['empty'] * empty
+            + weights['merges'] * merges
+            - weights['monotonicity'] * min(mono_left, mono_right)
+            - weights['smoothness'] * smoothness
+            - weights['sum'] * total)
+
+
+def corner_bonus(bb, weights=HEURISTIC_WEIGHTS):
+    top = max_rank(bb)
+    corners = (bb & 0xF, (bb >> 12) & 0xF, (bb >> 48) & 0xF, (bb >> 60) & 0xF)
+    return weights['corner'] * top if top in corners else 0.0
+
+
+# --- Line tables ---
+
+def _weights_key(weights):
+    return tuple(sorted(weights.items()))
+
+
+def table_path(weights=HEURISTIC_WEIGHTS, cache_dir=None):
+    """Cache file for the line table of one weight configuration."""
+    digest = hashlib.sha1(repr((TABLE_VERSION, _weights_key(weights))).encode()).hexdigest()[:16]
+    return os.path.join(cache_dir or CACHE_DIR, f"line_table_v{TABLE_VERSION}_{digest}.npy")
+
+
+def build_line_table(weights=HEURISTIC_WEIGHTS):
+    """Scores all 65536 lines with line_heuristic (about 0.3 s)."""
+    return np.array([line_heuristic([(row >> s) & 0xF for s in (0, 4, 8, 12)], weights)
+                     for row in range(65536)], dtype=np.float64)
+
+
+def _load_or_build(weights):
+    if not CACHE_DIR:
+        return build_line_table(weights)
+    path = table_path(weights)
+    try:
+        table = np.load(path, mmap_mode='r')
+        if table.shape == (65536,) and table.dtype == np.float64:
+            return table
+    except (OSError, ValueError):
+        pass
+
+    table = build_line_table(weights)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        # Write to a temp file and rename so concurrent processes never
+        # memory-map a half-written table
+        fd, tmp = tempfile.mkstemp(dir=CACHE_DIR, suffix='.npy')
+        with os.fdopen(fd, 'wb') as f:
+            np.save(f, table)
+        os.replace(tmp, path)
+    except OSError:
+        pass  # Read-only install: keep the table in memory
+    return table
+
+
+def _tables(weights):
+    entry = _tables_by_id.get(id(weights))
+    if entry is None or entry[1] != weights:
+        key = _weights_key(weights)
+        tables = _line_tables.get(key)
+        if tables is None:
+            table = _load_or_build(weights)
+            tables = (table, table.tolist())
+            _line_tables[key] = tables
+        entry = _tables_by_id[id(weights)] = (weights, dict(weights)) + tables
+    return entry[2:]
+
+
+def line_table(weights=HEURISTIC_WEIGHTS):
+    """65536-entry float64 table of line_heuristic for these weights.
+
+    Changing the weights (in place or by passing a new dict) selects a
+    different table, which is built and cached the first time it is needed.
+    """
+    return _tables(weights)[0]
+
+
+# --- Evaluation ---
+
+def evaluate_board(board, weights=HEURISTIC_WEIGHTS):
+    """Heuristic value of a board (bitboard int or 4x4 tile array)."""
+    bb = board if isinstance(board, int) else board_to_bitboard(board)
+    rows = _tables(weights)[1]
+    t = transpose(bb)
+    score = (rows[bb & 0xFFFF] + rows[(bb >> 16) & 0xFFFF]
+             + rows[(bb >> 32) & 0xFFFF] + rows[bb >> 48]
+             + rows[t & 0xFFFF] + rows[(t >> 16) & 0xFFFF]
+             + rows[(t >> 32) & 0xFFFF] + rows[t >> 48])
+    return score + corner_bonus(bb, weights)
+
+
+def transpose_array(bbs):
+    """Vectorized bitboard.transpose over a uint64 array."""
+    a = ((bbs & _U64(0xF0F00F0FF0F00F0F))
+         | ((bbs & _U64(0x0000F0F00000F0F0)) << _U64(12))
+         | ((bbs & _U64(0x0F0F00000F0F0000)) >> _U64(12)))
+    return ((a & _U64(0xFF00FF0000FF00FF))
+            | ((a & _U64(0x00FF00FF00000000)) >> _U64(24))
+            | ((a & _U64(0x00000000FF00FF00)) << _U64(24)))
+
+
+def evaluate_boards(bbs, weights=HEURISTIC_WEIGHTS):
+    """evaluate_board for a whole array (or list) of bitboards at once.
+
+    Terms are added in the same order as evaluate_board, so the floats come
+    out identical.
+    """
+    bbs = np.asarray(bbs, dtype=np.uint64)
+    table = line_table(weights)
+    mask = _U64(0xFFFF)
+
+    scores = np.zeros(bbs.shape, dtype=np.float64)
+    for source in (bbs, transpose_array(bbs)):
+        for shift in (0, 16, 32, 48):
+            scores += table[((source >> _U64(shift)) & mask).astype(np.intp)]
+
+    nibbles = (bbs[..., None] >> _NIBBLE_SHIFTS) & _U64(0xF)
+    top = nibbles.max(axis=-1)
+    in_corner = (nibbles[..., _CORNER_NIBBLES] == top[..., None]).any(axis=-1)
+    scores += np.where(in_corner, weights['corner'] * top.astype(np.float64), 0.0)
+    return scores
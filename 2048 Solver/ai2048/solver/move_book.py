@@ -0,0 +1,107 @@
+import mmap
+import os
+import struct
+
+import numpy as np
+
+from ai2048.engine.bitboard import MOVES, canonicalize, INVERSE_SYMMETRY_MOVES
+
+# --- Move book ---
+# A precomputed table of best moves, keyed by canonical board (see
+# bitboard.canonicalize) so one entry covers all 8 symmetric variants.
+#
+# File layout, all little-endian:
+#   header  MAGIC (8 bytes), version (uint32), record count (uint32)
+#   records sorted by key, RECORD_DTYPE each (16 bytes)
+#
+# The file is memory-mapped and binary-searched in place, so opening a book
+# costs nothing and a lookup only touches the few pages it searches.
+
+MAGIC = b'2048BOOK'
+VERSION = 1
+HEADER = struct.Struct('<8sII')
+
+RECORD_DTYPE = np.dtype([
+    ('key', '<u8'),    # Canonical bitboard
+    ('value', '<f4'),  # Expectimax score of the best move
+    ('move', 'u1'),    # Index into bitboard.MOVES, for the canonical board
+    ('depth', 'u1'),   # Search depth the entry was solved at
+    ('pad', 'u1', (2,)),
+])
+
+
+class MoveBook:
+    """Read-only view of a book file.
+
+    lookup(bb) returns (direction, value) translated back to bb's own
+    orientation, or None if the position is not in the book.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # Empty file
+            self._file.close()
+            raise ValueError(f"{path} is not a move book")
+        magic, version, count = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a move book")
+        if version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is move book version {version}, expected {VERSION}")
+        self.version = version
+        self.records = np.frombuffer(self._mmap, dtype=RECORD_DTYPE, count=count, offset=HEADER.size)
+        self.keys = self.records['key']
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.records)
+
+    def lookup(self, bb):
+        canon, sym = canonicalize(bb)
+        key = np.uint64(canon)
+        i = int(self.keys.searchsorted(key))
+        if i < len(self.keys) and self.keys[i] == key:
+            record = self.records[i]
+            self.hits += 1
+            return INVERSE_SYMMETRY_MOVES[sym][MOVES[record['move']]], float(record['value'])
+        self.misses += 1
+        return None
+
+    def close(self):
+        self.records = self.keys = None
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                pass  # A caller still holds a view of the records
+            self._mmap = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_book(path, entries):
+    """Writes {canonical bb: (direction, value, depth)} as a sorted book file.
+
+    The file is written next to path and renamed into place, so a running
+    solver that has the old book mapped keeps reading a complete file.
+    """
+    records = np.zeros(len(entries), dtype=RECORD_DTYPE)
+    for i, (key, (move, value, depth)) in enumerate(sorted(entries.items())):
+        records[i] = (key, value, MOVES.index(move), depth, (0, 0))
+
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(records)))
+        f.write(records.tobytes())
+    os.replace(tmp, path)
+    return len(records)
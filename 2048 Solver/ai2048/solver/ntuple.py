@@ -0,0 +1,256 @@
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from ai2048.engine import batch_game
+from ai2048.engine.bitboard import apply_symmetry, board_to_bitboard
+
+# --- N-tuple network evaluator ---
+# A learned alternative to heuristic.evaluate_board. Each pattern is a
+# handful of board cells; the ranks on those cells index a float32 weight
+# table, and the value of a board is the sum over all patterns and all 8
+# board symmetries. Weights are trained with TD(0) on afterstates (the board
+# right after a move, before the spawn) by self-play on batch_game.
+#
+# The network predicts the score still to come. evaluate_board adds the
+# score the board already represents (every merge into a 2^k tile scored
+# 2^k), so the result estimates the final game score and a plain expectimax
+# over it accounts for the merge rewards along each line of play.
+
+# Four 6-cell patterns (cells are nibble indexes 4*r + c), the usual choice
+# for 2048 n-tuple networks: two 2x3 rectangles and two straight+corner shapes
+DEFAULT_PATTERNS = (
+    (0, 1, 2, 3, 4, 5),
+    (4, 5, 6, 7, 8, 9),
+    (0, 1, 2, 4, 5, 6),
+    (4, 5, 6, 8, 9, 10),
+)
+
+# Bumped when the checkpoint layout changes
+CHECKPOINT_VERSION = 1
+
+_U64 = np.uint64
+_NIBBLE_SHIFTS = np.arange(0, 64, 4, dtype=np.uint64)
+
+
+def _cell_after(cell, sym):
+    """Where cell ends up under bitboard symmetry sym."""
+    bb = apply_symmetry(1 << (4 * cell), sym)
+    return (bb.bit_length() - 1) // 4
+
+
+def symmetric_patterns(pattern):
+    """The 8 images of a pattern under the board symmetries."""
+    return [tuple(_cell_after(cell, sym) for cell in pattern) for sym in range(8)]
+
+
+def _build_board_scores():
+    """Score already earned for every row: a 2^k tile took merges worth (k - 1) * 2^k."""
+    ranks = (np.arange(65536)[:, None] >> np.array([0, 4, 8, 12])) & 0xF
+    earned = np.where(ranks >= 2, (ranks - 1) * (1 << ranks), 0)
+    return earned.sum(axis=1).astype(np.float64)
+
+
+_ROW_EARNED = _build_board_scores()
+_ROW_EARNED_LIST = _ROW_EARNED.tolist()
+
+
+def board_score(bb):
+    """Score implied by the tiles on bb, counting spawned 4s as merged."""
+    t = _ROW_EARNED_LIST
+    return t[bb & 0xFFFF] + t[(bb >> 16) & 0xFFFF] + t[(bb >> 32) & 0xFFFF] + t[bb >> 48]
+
+
+def board_scores(bbs):
+    bbs = np.asarray(bbs, dtype=np.uint64)
+    return sum(_ROW_EARNED[((bbs >> _U64(s)) & _U64(0xFFFF)).astype(np.intp)] for s in (0, 16, 32, 48))
+
+
+class NTupleNetwork:
+    """Sum of per-pattern weight tables over all 8 symmetries of the board.
+
+    weights is a (patterns, 16 ** tuple_size) float32 array, one flat table
+    per pattern; all patterns must have the same size. Pass an mmap'ed array
+    (see load) for inference without reading the file into memory.
+    """
+
+    def __init__(self, patterns=DEFAULT_PATTERNS, weights=None):
+        self.patterns = tuple(tuple(p) for p in patterns)
+        size = len(self.patterns[0])
+        if any(len(p) != size for p in self.patterns):
+            raise ValueError("All n-tuple patterns must have the same length")
+        if weights is None:
+            weights = np.zeros((len(self.patterns), 16 ** size), dtype=np.float32)
+        self.weights = weights
+
+        # (pattern, symmetry) -> cells, flattened; feature f reads table f // 8
+        self._features = [cells for p in self.patterns for cells in symmetric_patterns(p)]
+        self._tables = [f // 8 for f in range(len(self._features))]
+        self._cells = np.array(self._features, dtype=np.intp)
+        self._place = (4 * np.arange(size)).astype(np.int64)
+        # Scalar path: one flat float32 view, read by (table offset, cells)
+        self._flat = memoryview(np.ascontiguousarray(self.weights).reshape(-1)).cast('B').cast('f')
+        self._scalar = [(table * 16 ** size, [(cell, 4 * i) for i, cell in enumerate(cells)])
+                        for table, cells in zip(self._tables, self._features)]
+
+    @property
+    def n_features(self):
+        return len(self._features)
+
+    # --- Evaluation ---
+
+    def value(self, bb):
+        """Predicted score still to come from afterstate bb."""
+        nibbles = [(bb >> shift) & 0xF for shift in range(0, 64, 4)]
+        flat = self._flat
+        total = 0.0
+        for offset, cells in self._scalar:
+            index = offset
+            for cell, shift in cells:
+                index |= nibbles[cell] << shift
+            total += flat[index]
+        return total
+
+    def indices(self, bbs):
+        """(features, B) weight indexes of every feature on every board."""
+        nibbles = ((bbs[:, None] >> _NIBBLE_SHIFTS) & _U64(0xF)).astype(np.int64)
+        picked = nibbles[:, self._cells]  # (B, features, size)
+        return (picked << self._place).sum(axis=-1).T
+
+    def values(self, bbs):
+        bbs = np.asarray(bbs, dtype=np.uint64)
+        idx = self.indices(bbs)
+        total = np.zeros(len(bbs), dtype=np.float64)
+        for f, table in enumerate(self._tables):
+            total += self.weights[table, idx[f]]
+        return total
+
+    def evaluate_board(self, board):
+        """Estimated final score, for use as ai_solver.EVALUATOR."""
+        bb = board if isinstance(board, int) else board_to_bitboard(board)
+        return board_score(bb) + self.value(bb)
+
+    def evaluate_boards(self, bbs):
+        bbs = np.asarray(bbs, dtype=np.uint64)
+        return board_scores(bbs) + self.values(bbs)
+
+    # --- Training ---
+
+    def update(self, bbs, deltas, alpha):
+        """Moves every feature of bbs by alpha * delta / n_features."""
+        idx = self.indices(np.asarray(bbs, dtype=np.uint64))
+        step = (alpha / self.n_features * np.asarray(deltas)).astype(np.float32)
+        for f, table in enumerate(self._tables):
+            np.add.at(self.weights[table], idx[f], step)
+
+    # --- Checkpoints ---
+
+    def save(self, path):
+        """Writes the weights to path (.npy) and the patterns to path + '.json'."""
+        tmp = path + '.tmp.npy'
+        np.save(tmp, np.asarray(self.weights, dtype=np.float32))
+        os.replace(tmp, path)
+        with open(path + '.json', 'w') as f:
+            json.dump({'version': CHECKPOINT_VERSION, 'patterns': self.patterns}, f)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """Loads a checkpoint; mmap=False copies the weights into RAM for training."""
+        with open(path + '.json') as f:
+            meta = json.load(f)
+        if meta.get('version') != CHECKPOINT_VERSION:
+            raise ValueError(f"{path} is n-tuple checkpoint version {meta.get('version')}, "
+                             f"expected {CHECKPOINT_VERSION}")
+        weights = np.load(path, mmap_mode='r' if mmap else None)
+        return cls(meta['patterns'], weights)
+
+
+# --- TD(0) self-play ---
+
+def train(network, games, batch_size=64, alpha=0.05, seed=0, checkpoint=None, checkpoint_every=10000,
+          report_every=1000):
+    """Trains network on games self-play games, batch_size at a time.
+
+    Every game picks the move maximizing reward + value(afterstate). The
+    previous afterstate is then pulled towards reward + value of the next
+    chosen afterstate, or towards 0 when the game ended. Returns the final
+    score and max tile of every finished game.
+    """
+    rng = np.random.default_rng(seed)
+    boards = batch_game.spawn_tiles(batch_game.spawn_tiles(np.zeros(batch_size, dtype=np.uint64), rng), rng)
+    scores = np.zeros(batch_size, dtype=np.int64)
+    prev_after = np.zeros(batch_size, dtype=np.uint64)
+    has_prev = np.zeros(batch_size, dtype=bool)
+    finished_scores = []
+    finished_tiles = []
+    idx = np.arange(batch_size)
+    start = time.perf_counter()
+    last_report = last_checkpoint = 0
+
+    while len(finished_scores) < games:
+        moved, rewards = batch_game.all_moves(boards)
+        legal = moved != boards
+        values = network.values(moved.ravel()).reshape(4, batch_size)
+        q = np.where(legal, rewards + values, -np.inf)
+        actions = q.argmax(axis=0)
+        dead = ~legal.any(axis=0)
+        after = moved[actions, idx]
+
+        if has_prev.any():
+            target = np.where(dead, 0.0, q[actions, idx])
+            delta = target - network.values(prev_after)
+            network.update(prev_after[has_prev], delta[has_prev], alpha)
+
+        scores += np.where(dead, 0, rewards[actions, idx])
+        if dead.any():
+            top = (boards[dead, None] >> _NIBBLE_SHIFTS) & _U64(0xF)
+            finished_scores.extend(scores[dead].tolist())
+            finished_tiles.extend((1 << top.max(axis=1).astype(np.int64)).tolist())
+            scores[dead] = 0
+
+        fresh = batch_game.spawn_tiles(batch_game.spawn_tiles(np.zeros(batch_size, dtype=np.uint64), rng), rng)
+        boards = np.where(dead, fresh, batch_game.spawn_tiles(after, rng, ~dead))
+        prev_after = after
+        has_prev = ~dead
+
+        done = len(finished_scores)
+        if report_every and done - last_report >= report_every:
+            recent = finished_scores[-report_every:]
+            tiles = finished_tiles[-report_every:]
+            print(f"{done} games  mean score {np.mean(recent):.0f}  "
+                  f"2048 rate {np.mean(np.array(tiles) >= 2048):.3f}  {time.perf_counter() - start:.0f}s")
+            last_report = done
+        if checkpoint and done - last_checkpoint >= checkpoint_every:
+            network.save(checkpoint)
+            last_checkpoint = done
+
+    if checkpoint:
+        network.save(checkpoint)
+    return finished_scores, finished_tiles
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train an n-tuple network evaluator by TD(0) self-play.")
+    parser.add_argument('checkpoint', help="Weights file to write (and resume from if it exists)")
+    parser.add_argument('--games', type=int, default=100000)
+    parser.add_argument('--batch', type=int, default=64, help="Games played in parallel")
+    parser.add_argument('--alpha', type=float, default=0.05, help="Learning rate, shared over all features")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--checkpoint-every', type=int, default=10000, help="Games between checkpoints")
+    parser.add_argument('--report-every', type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    if os.path.exists(args.checkpoint):
+        network = NTupleNetwork.load(args.checkpoint, mmap=False)
+        print(f"Resuming from {args.checkpoint}")
+    else:
+        network = NTupleNetwork()
+    train(network, args.games, args.batch, args.alpha, args.seed, args.checkpoint,
+          args.checkpoint_every, args.report_every)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+from collections import OrderedDict
+from itertools import islice
+
+# Rough per-entry footprint of an OrderedDict slot holding an int key and a
+# float value (key object + value object + dict slot + linked-list node).
+ENTRY_BYTES = 200
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# How many of the least recently used entries the depth-preferred policy
+# looks at when it has to make room.
+EVICTION_WINDOW = 8
+
+
+def make_key(bb, depth):
+    """Packs a bitboard and the remaining search depth into one int key.
+
+    The bitboard already is a collision-free 64-bit encoding of the position,
+    so it is used directly instead of a separate Zobrist hash.
+    """
+    return (depth << 64) | bb
+
+
+def key_depth(key):
+    return key >> 64
+
+
+class TranspositionTable:
+    """Bounded cache of expectimax values keyed by (board, remaining depth).
+
+    policy='lru' evicts the least recently used entry. policy='depth' looks at
+    the EVICTION_WINDOW oldest entries and evicts the shallowest one, so the
+    expensive deep results survive longer.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, policy='lru'):
+        if policy not in ('lru', 'depth'):
+            raise ValueError(f"Unknown eviction policy: {policy}")
+        self.max_entries = max(1, max_bytes // ENTRY_BYTES)
+        self.policy = policy
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Returns the cached value for key, or None on a miss."""
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        entries = self._entries
+        entries[key] = value
+        entries.move_to_end(key)
+        if len(entries) > self.max_entries:
+            self._evict()
+
+    def _evict(self):
+        entries = self._entries
+        if self.policy == 'lru':
+            entries.popitem(last=False)
+        else:
+            victim = min(islice(entries, EVICTION_WINDOW), key=key_depth)
+            del entries[victim]
+        self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def reset_stats(self):
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(self._entries),
+            'capacity': self.max_entries,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1 @@
+"""Reading boards from screenshots: locating, colour/LUT/OCR recognition and tracking (needs OpenCV)."""
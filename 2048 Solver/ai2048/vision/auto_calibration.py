@@ -0,0 +1,294 @@
+import argparse
+import glob
+import json
+import os
+import time
+
+import numpy as np
+
+from ai2048 import config as settings
+from ai2048.engine import game_logic
+from ai2048.vision.board_locator import BoardLocator
+from ai2048.vision.board_recognition import ColorBoardRecognizer, LUT_LEVELS, LUT_UNKNOWN
+from ai2048.device.capture import make_capture
+
+# --- Automatic colour calibration ---
+# Learns tile colours from frames recorded while a game is played, one
+# settled frame per move, with no manual labelling:
+#   1. Every tile colour is grouped into a cluster of near-identical colours.
+#   2. The empty-tile cluster is the one that most often dominates a frame.
+#   3. The game rules (game_logic) label the rest: if every tile on one frame
+#      is known, exactly one move must turn it into the next frame plus one
+#      spawned tile, and that prediction labels any unknown cluster on the
+#      next frame. Merges carry labels upward, so 2048 and beyond are learned
+#      as soon as they appear. The 2 and 4 clusters are the pair of frequent
+#      clusters under which the most frame pairs come out consistent.
+# The labelled clusters are compiled into a quantized colour -> tile lookup
+# table for board_recognition.LutBoardRecognizer.
+
+# Tile colours closer than this (Euclidean BGR) belong to the same cluster
+CLUSTER_RADIUS = 12.0
+# Clusters seen fewer times than this are treated as noise (e.g. animations)
+MIN_CLUSTER_COUNT = 3
+# Frequent clusters tried as the '2' and '4' colours
+SPAWN_CANDIDATES = 6
+# LUT cells further than this from every labelled colour stay unknown
+LUT_THRESHOLD = 25.0
+
+GAME_MOVES = {
+    'up': game_logic.move_up,
+    'down': game_logic.move_down,
+    'left': game_logic.move_left,
+    'right': game_logic.move_right,
+}
+
+
+# --- Clustering ---
+
+def cluster_frames(colors):
+    """Groups (N, 4, 4, 3) tile colours; returns (ids (N, 4, 4), centres, counts)."""
+    flat = colors.reshape(-1, 3)
+    centres = []
+    sums = []
+    counts = []
+    ids = np.empty(len(flat), dtype=np.int64)
+    for i, color in enumerate(flat):
+        if centres:
+            dist = np.linalg.norm(np.array(centres) - color, axis=1)
+            best = int(dist.argmin())
+            if dist[best] <= CLUSTER_RADIUS:
+                ids[i] = best
+                sums[best] += color
+                counts[best] += 1
+                centres[best] = sums[best] / counts[best]
+                continue
+        ids[i] = len(centres)
+        centres.append(color.astype(np.float64))
+        sums.append(color.astype(np.float64))
+        counts.append(1)
+    return ids.reshape(colors.shape[:3]), np.array(centres), np.array(counts)
+
+
+def empty_cluster(ids):
+    """The cluster that is most often the most common colour on a frame."""
+    votes = np.bincount([np.bincount(frame.ravel()).argmax() for frame in ids])
+    return int(votes.argmax())
+
+
+# --- Labelling with the game rules ---
+
+def _explain(before, after_ids, labels, empty):
+    """Label assignments implied by the moves that explain one frame pair.
+
+    before is a fully labelled board. Returns a list with one dict of new
+    {cluster: value} per move consistent with after_ids.
+    """
+    explanations = []
+    for move in GAME_MOVES.values():
+        predicted, _ = move(before)
+        if np.array_equal(predicted, before):
+            continue
+        new = {}
+        spawns = 0
+        ok = True
+        for (r, c), cluster in np.ndenumerate(after_ids):
+            expected = int(predicted[r, c])
+            if expected == 0:
+                if cluster == empty:
+                    continue
+                spawns += 1
+                value = labels.get(cluster, new.get(cluster))
+                if value is not None and value not in (2, 4):
+                    ok = False
+                    break
+                continue
+            known = labels.get(cluster, new.get(cluster))
+            if known is None:
+                new[cluster] = expected
+            elif known != expected:
+                ok = False
+                break
+        if ok and spawns == 1:
+            explanations.append(new)
+    return explanations
+
+
+def propagate(ids, labels, empty):
+    """Labels clusters from consecutive frames until nothing changes.
+
+    Returns (labels, number of frame pairs explained by some move).
+    """
+    labels = dict(labels)
+    changed = True
+    while changed:
+        changed = False
+        explained = 0
+        for t in range(len(ids) - 1):
+            if np.array_equal(ids[t], ids[t + 1]):
+                continue
+            clusters = np.unique(ids[t])
+            if any(int(c) not in labels for c in clusters):
+                continue
+            before = np.vectorize(lambda c: labels[int(c)])(ids[t])
+            explanations = _explain(before, ids[t + 1], labels, empty)
+            if not explanations:
+                continue
+            explained += 1
+            # Only learn from unambiguous pairs
+            if all(e == explanations[0] for e in explanations) and explanations[0]:
+                labels.update(explanations[0])
+                changed = True
+    return labels, explained
+
+
+def label_clusters(ids, counts):
+    """Finds {cluster: tile value} for the clusters in ids."""
+    empty = empty_cluster(ids)
+    candidates = [int(c) for c in np.argsort(counts)[::-1] if c != empty][:SPAWN_CANDIDATES]
+    best = ({empty: 0}, -1)
+    for two in candidates:
+        for four in candidates:
+            if two == four:
+                continue
+            labels, explained = propagate(ids, {empty: 0, two: 2, four: 4}, empty)
+            if explained > best[1] or (explained == best[1] and len(labels) > len(best[0])):
+                best = (labels, explained)
+    return best
+
+
+# --- Lookup table ---
+
+def compile_lut(centres, labels, threshold=LUT_THRESHOLD, levels=LUT_LEVELS):
+    """(levels, levels, levels, 3) uint8 table of [rank, confidence, distance].
+
+    rank is log2 of the tile (0 = empty, LUT_UNKNOWN = no colour within
+    threshold), confidence is 255 * (1 - best / second best distance) and
+    distance the best distance, clipped to 255. Each cell is scored at the
+    centre of its colour bin.
+    """
+    known = sorted(labels.items(), key=lambda item: item[1])
+    colors = np.array([centres[c] for c, _ in known], dtype=np.float64)
+    ranks = np.array([0 if v == 0 else int(v).bit_length() - 1 for _, v in known], dtype=np.int64)
+
+    step = 256 // levels
+    axis = np.arange(levels) * step + (step - 1) / 2.0
+    grid = np.stack(np.meshgrid(axis, axis, axis, indexing='ij'), axis=-1).reshape(-1, 3)
+    dist = np.linalg.norm(grid[:, None, :] - colors[None], axis=-1)
+    order = np.argsort(dist, axis=1)
+    best = dist[np.arange(len(grid)), order[:, 0]]
+    second = dist[np.arange(len(grid)), order[:, 1]] if len(colors) > 1 else np.full(len(grid), np.inf)
+
+    rank = ranks[order[:, 0]]
+    # Two clusters can share a value; only a different value is a real rival
+    rival = np.where(ranks[order[:, 1]] == rank, np.inf, second) if len(colors) > 1 else second
+    confidence = np.where(np.isinf(rival), 1.0, 1.0 - best / np.maximum(rival, 1e-9))
+    rank = np.where(best > threshold, LUT_UNKNOWN, rank)
+    confidence = np.where(best > threshold, 0.0, confidence)
+
+    lut = np.stack([rank, np.round(confidence * 255), np.minimum(best, 255)], axis=-1)
+    return lut.astype(np.uint8).reshape(levels, levels, levels, 3)
+
+
+# --- Frames ---
+
+def load_frames(frame_dir):
+    import cv2
+    paths = []
+    for pattern in ('*.png', '*.jpg', '*.npy'):
+        paths += glob.glob(os.path.join(frame_dir, pattern))
+    return [np.load(p) if p.endswith('.npy') else cv2.imread(p) for p in sorted(paths)]
+
+
+def frame_colors(frames, crop=None, recognizer=None):
+    """(N, 4, 4, 3) tile colours; the board is located automatically without crop."""
+    recognizer = recognizer or ColorBoardRecognizer({0: [0, 0, 0]})
+    locator = BoardLocator()
+    colors = []
+    for frame in frames:
+        if crop is not None:
+            y1, y2, x1, x2 = crop
+            board = frame[y1:y2, x1:x2]
+        else:
+            board = locator.board(frame)
+            if board is None:
+                continue
+        colors.append(recognizer.tile_colors(board))
+    return np.array(colors)
+
+
+def record_frames(frame_dir, count, adb_path='adb', crop=None, interval=0.2):
+    """Saves one settled frame per move while someone plays on the device."""
+    os.makedirs(frame_dir, exist_ok=True)
+    recognizer = ColorBoardRecognizer({0: [0, 0, 0]}, samples=4)
+    locator = BoardLocator()
+    saved = 0
+    last = previous = None
+    with make_capture('stream', adb_path=adb_path) as device:
+        while saved < count:
+            frame = device.capture()
+            if frame is None:
+                break
+            board = locator.board(frame) if crop is None else frame[crop[0]:crop[1], crop[2]:crop[3]]
+            if board is not None:
+                signature = recognizer.tile_colors(board)
+                settled = previous is not None and np.array_equal(signature, previous)
+                if settled and (last is None or not np.array_equal(signature, last)):
+                    np.save(os.path.join(frame_dir, f"frame_{saved:05d}.npy"), frame.copy())
+                    saved += 1
+                    last = signature
+                    print(f"📸 {saved}/{count}")
+                previous = signature
+            time.sleep(interval)
+    return saved
+
+
+def calibrate(colors):
+    """Clusters and labels tile colours; returns (centres, counts, labels, explained pairs)."""
+    ids, centres, counts = cluster_frames(colors)
+    labels, explained = label_clusters(ids, counts)
+    labels = {c: v for c, v in labels.items() if counts[c] >= MIN_CLUSTER_COUNT}
+    return centres, counts, labels, explained
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Learn tile colours from recorded frames and build a colour LUT.")
+    parser.add_argument('frames', help="Directory of frames, one per move, in file name order")
+    parser.add_argument('--out', default='color_lut.npy', help="Lookup table to write")
+    parser.add_argument('--crop', type=int, nargs=4, metavar=('Y1', 'Y2', 'X1', 'X2'),
+                        help="Board region (default: locate it automatically)")
+    parser.add_argument('--record', type=int, default=0,
+                        help="First record this many frames from the device into the directory")
+    parser.add_argument('--adb', help="Path to the adb executable (default: adb_path setting)")
+    parser.add_argument('--threshold', type=float, default=LUT_THRESHOLD)
+    settings.add_config_arguments(parser)
+    args = parser.parse_args(argv)
+    config = settings.from_args(args)
+
+    if args.record:
+        record_frames(args.frames, args.record, args.adb or config['adb_path'], args.crop)
+    colors = frame_colors(load_frames(args.frames), args.crop)
+    if len(colors) < 2:
+        parser.error("Need at least two frames with a visible board")
+
+    centres, counts, labels, explained = calibrate(colors)
+    print(f"{len(colors)} frames, {len(centres)} colour clusters, {explained} move transitions explained")
+    for cluster, value in sorted(labels.items(), key=lambda item: item[1]):
+        print(f"  {value:>6}: BGR {np.round(centres[cluster]).astype(int).tolist()} ({counts[cluster]} tiles)")
+    unlabelled = [c for c in range(len(centres)) if c not in labels and counts[c] >= MIN_CLUSTER_COUNT]
+    if unlabelled:
+        print(f"⚠️ {len(unlabelled)} frequent colours could not be labelled")
+
+    lut = compile_lut(centres, labels, args.threshold)
+    np.save(args.out, lut)
+    print(f"Wrote {args.out}")
+
+    # The cluster centres also work as REFERENCE_COLORS for ColorBoardRecognizer
+    reference = {}
+    for cluster, value in labels.items():
+        if value not in reference or counts[cluster] > reference[value][1]:
+            reference[value] = (np.round(centres[cluster]).astype(int).tolist(), counts[cluster])
+    print("REFERENCE_COLORS = " + json.dumps({v: c for v, (c, _) in sorted(reference.items())}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+import json
+import os
+
+import numpy as np
+
+from ai2048.device.capture import CaptureBackend
+
+# --- Automatic board location ---
+# The board is a near-square block of one background colour with the 16
+# tiles cut out of it. locate_board() segments that colour, takes the
+# largest square-ish contour as the board, and reads the grid lines from how
+# much of each pixel row/column is background. The geometry is cached per
+# screen resolution and re-checked every frame by sampling a few pixels that
+# must lie on the grid lines, so the full search only reruns when the board
+# moves (or a new device shows up).
+
+# Board background of the classic game (#bbada0), BGR
+BOARD_COLOR = (160, 173, 187)
+# Per-channel leeway when matching the background. Empty tiles are only ~25
+# away from it, so this has to stay well below that.
+COLOR_TOLERANCE = 12
+# Smallest board, as a fraction of the screen area
+MIN_BOARD_FRACTION = 0.05
+# Pixel rows/columns at least this much background count as a grid line
+GRID_LINE_FRACTION = 0.6
+# Share of probe pixels that must still match for a cached geometry to be used
+PROBE_MATCH_FRACTION = 0.9
+
+
+class BoardGeometry:
+    """Where the board is on one screen resolution.
+
+    crop is (y1, y2, x1, x2) in screen pixels, trimmed to the middle of the
+    outer grid lines so an even 4x4 split lands on the tiles. cells holds the
+    (y, x) centre of every tile and probes (y, x) points on the grid lines,
+    both relative to the crop.
+    """
+
+    def __init__(self, crop, cells, probes, background):
+        self.crop = tuple(int(v) for v in crop)
+        self.cells = np.asarray(cells, dtype=np.intp).reshape(4, 4, 2)
+        self.probes = np.asarray(probes, dtype=np.intp).reshape(-1, 2)
+        self.background = np.asarray(background, dtype=np.int16)
+
+    @property
+    def shape(self):
+        y1, y2, x1, x2 = self.crop
+        return y2 - y1, x2 - x1
+
+    def board(self, frame):
+        y1, y2, x1, x2 = self.crop
+        return frame[y1:y2, x1:x2]
+
+    def to_dict(self):
+        return {'crop': list(self.crop), 'cells': self.cells.tolist(), 'probes': self.probes.tolist(),
+                'background': self.background.tolist()}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['crop'], data['cells'], data['probes'], data['background'])
+
+
+def _runs(flags):
+    """(start, end) of every run of True in a 1-D bool array."""
+    padded = np.concatenate([[False], flags, [False]])
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    return list(zip(edges[::2], edges[1::2]))
+
+
+def _grid_lines(profile, size):
+    """Centres of the 5 grid lines along one axis, or an even split."""
+    runs = _runs(profile >= GRID_LINE_FRACTION)
+    if len(runs) == 5:
+        return [(start + end - 1) / 2.0 for start, end in runs]
+    return [k * (size - 1) / 4.0 for k in range(5)]
+
+
+def locate_board(frame, board_color=BOARD_COLOR, tolerance=COLOR_TOLERANCE):
+    """Finds the board on a full screenshot; returns a BoardGeometry or None."""
+    import cv2
+    image = np.ascontiguousarray(frame[..., :3])
+    color = np.array(board_color, dtype=np.int16)
+    lower = np.clip(color - tolerance, 0, 255).astype(np.uint8)
+    upper = np.clip(color + tolerance, 0, 255).astype(np.uint8)
+    mask = cv2.inRange(image, lower, upper)
+
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    min_area = MIN_BOARD_FRACTION * image.shape[0] * image.shape[1]
+    best = None
+    for contour in contours:
+        x, y, w, h = cv2.boundingRect(contour)
+        if w * h < min_area or not 0.8 <= w / h <= 1.25:
+            continue
+        if best is None or w * h > best[2] * best[3]:
+            best = (x, y, w, h)
+    if best is None:
+        return None
+
+    x, y, w, h = best
+    background = mask[y:y + h, x:x + w] > 0
+    rows = _grid_lines(background.mean(axis=1), h)
+    cols = _grid_lines(background.mean(axis=0), w)
+
+    # Crop from the middle of the first grid line to the middle of the last
+    top, bottom = y + int(round(rows[0])), y + int(round(rows[-1])) + 1
+    left, right = x + int(round(cols[0])), x + int(round(cols[-1])) + 1
+    rows = [r + y - top for r in rows]
+    cols = [c + x - left for c in cols]
+
+    row_centres = [(rows[i] + rows[i + 1]) / 2.0 for i in range(4)]
+    col_centres = [(cols[i] + cols[i + 1]) / 2.0 for i in range(4)]
+    cells = [[(int(round(ry)), int(round(cx))) for cx in col_centres] for ry in row_centres]
+    height, width = bottom - top, right - left
+    probes = ([(min(int(round(ry)), height - 1), int(round(cx))) for ry in rows for cx in col_centres]
+              + [(int(round(ry)), min(int(round(cx)), width - 1)) for cx in cols for ry in row_centres])
+    return BoardGeometry((top, bottom, left, right), cells, probes, board_color)
+
+
+def validate(board, geometry, tolerance=COLOR_TOLERANCE):
+    """True if a cropped board still has background on the geometry's grid lines."""
+    if board.shape[:2] != geometry.shape:
+        return False
+    probes = geometry.probes
+    colors = board[probes[:, 0], probes[:, 1], :3].astype(np.int16)
+    matches = (np.abs(colors - geometry.background) <= tolerance).all(axis=-1)
+    return matches.mean() >= PROBE_MATCH_FRACTION
+
+
+class BoardLocator:
+    """Finds and caches board geometry per screen resolution.
+
+    With cache_path the geometries are also kept in a JSON file, so a known
+    device needs no detection at all on the next run.
+    """
+
+    def __init__(self, cache_path=None, board_color=BOARD_COLOR, tolerance=COLOR_TOLERANCE):
+        self.cache_path = cache_path
+        self.board_color = board_color
+        self.tolerance = tolerance
+        self.geometries = {}
+        self.locates = 0
+        if cache_path and os.path.exists(cache_path):
+            with open(cache_path) as f:
+                self.geometries = {key: BoardGeometry.from_dict(data) for key, data in json.load(f).items()}
+
+    @staticmethod
+    def _key(frame):
+        return f"{frame.shape[1]}x{frame.shape[0]}"
+
+    def _save(self):
+        if self.cache_path:
+            with open(self.cache_path, 'w') as f:
+                json.dump({key: g.to_dict() for key, g in self.geometries.items()}, f, indent=1)
+
+    def cached(self, frame):
+        """The cached geometry for this frame's resolution, or None."""
+        return self.geometries.get(self._key(frame))
+
+    def locate(self, frame):
+        """Runs the full detection on frame and caches the result."""
+        self.locates += 1
+        geometry = locate_board(frame, self.board_color, self.tolerance)
+        if geometry is not None:
+            self.geometries[self._key(frame)] = geometry
+            self._save()
+        return geometry
+
+    def geometry(self, frame):
+        """Geometry for frame: the cached one if its probes still match, else a fresh one."""
+        geometry = self.cached(frame)
+        if geometry is not None and validate(geometry.board(frame), geometry, self.tolerance):
+            return geometry
+        return self.locate(frame)
+
+    def board(self, frame):
+        """The cropped board in frame, or None if no board is visible."""
+        geometry = self.geometry(frame)
+        return None if geometry is None else geometry.board(frame)
+
+
+class BoardCapture(CaptureBackend):
+    """Wraps a capture backend so capture() returns only the located board.
+
+    Once the board is found, the backend is asked for just that region
+    (set_roi), which for the stream backend means only the board rows cross
+    the USB link. Every frame is checked with the probe pixels; when they stop
+    matching, one full frame is captured and the board is located again.
+    """
+
+    def __init__(self, backend, locator=None):
+        self.backend = backend
+        self.locator = locator or BoardLocator()
+        self.geometry = None
+
+    def _full_frame(self):
+        self.backend.set_roi(None)
+        return self.backend.capture()
+
+    def capture(self):
+        if self.geometry is not None:
+            frame = self.backend.capture()
+            if frame is None:
+                return None
+            board = frame if frame.shape[:2] == self.geometry.shape else self.geometry.board(frame)
+            if validate(board, self.geometry, self.locator.tolerance):
+                return board
+
+        frame = self._full_frame()
+        if frame is None:
+            return None
+        self.geometry = self.locator.geometry(frame)
+        if self.geometry is None:
+            return None
+        self.backend.set_roi(self.geometry.crop)
+        return self.geometry.board(frame)
+
+    def close(self):
+        self.backend.close()
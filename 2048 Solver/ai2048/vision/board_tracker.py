@@ -0,0 +1,65 @@
+import numpy as np
+
+from ai2048.engine.bitboard import move_board
+
+# --- Incremental board tracking ---
+# After a swipe the next board is known except for the one spawned tile. The
+# tracker predicts it with the game rules, checks the screen with a few probe
+# pixels per tile, and only falls back to a full read when the screen does not
+# match the prediction plus exactly one new '2' or '4'.
+
+# Pixels sampled per tile edge for the cheap verification pass
+PROBE_SAMPLES = 4
+
+
+class BoardTracker:
+    """Keeps the current board in sync with the screen between moves."""
+
+    def __init__(self, recognizer, probe_samples=PROBE_SAMPLES):
+        self.recognizer = recognizer
+        self.probe_samples = probe_samples
+        self.board = None
+        self.predicted = None
+        self.full_reads = 0
+        self.incremental_reads = 0
+
+    def reset(self, board=None):
+        self.board = None if board is None else np.array(board)
+        self.predicted = None
+
+    def predict(self, move):
+        """Applies move to the current board and returns the board before the spawn."""
+        if self.board is None:
+            self.predicted = None
+            return None
+        self.predicted, _ = move_board(self.board, move.lower())
+        return self.predicted
+
+    def full_read(self, cropped):
+        board, _, _ = self.recognizer.read(cropped)
+        self.full_reads += 1
+        self.board = board
+        self.predicted = None
+        return board
+
+    def observe(self, cropped):
+        """Returns the board on screen, reading as little of it as possible."""
+        if self.predicted is None:
+            return self.full_read(cropped)
+
+        colors = self.recognizer.tile_colors(cropped, samples=self.probe_samples)
+        probe, _, confidence = self.recognizer.match(colors)
+
+        changed = probe != self.predicted
+        spawned = changed & (self.predicted == 0)
+        if (changed & ~spawned).any() or spawned.sum() != 1:
+            return self.full_read(cropped)
+        if probe[spawned][0] not in (2, 4) or confidence[spawned][0] <= 0:
+            return self.full_read(cropped)
+
+        board = self.predicted.copy()
+        board[spawned] = probe[spawned]
+        self.incremental_reads += 1
+        self.board = board
+        self.predicted = None
+        return board
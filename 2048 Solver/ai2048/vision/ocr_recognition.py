@@ -0,0 +1,148 @@
+import hashlib
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+import pytesseract
+
+# --- Batched Tesseract board reader ---
+# Tiles are thresholded like autoplay_ocr.py always did, then looked up in a
+# content-hash cache. Only tiles that changed since they were last seen reach
+# Tesseract, and those are read either as one stacked image in a single
+# Tesseract call ('batch') or one call per tile on a thread pool ('threads').
+# Empty tiles threshold to a single flat colour and are recognised as blank
+# without Tesseract. Tiles with ink that the stacked read still leaves blank
+# are re-read on their own before caching.
+
+# Blank rows between stacked tiles so Tesseract sees one number per line
+STACK_PADDING = 12
+# A thresholded tile with less than this fraction of pixels in its minority
+# colour has no digits on it. Only the middle of the tile is counted, so the
+# grid gaps at its edges do not look like ink.
+BLANK_INK = 0.01
+BLANK_MARGIN = 0.125
+
+
+def split_tiles(board_img):
+    """Splits a cropped board into a 4x4 list of tile images."""
+    tile_h = board_img.shape[0] // 4
+    tile_w = board_img.shape[1] // 4
+    return [[board_img[i * tile_h:(i + 1) * tile_h, j * tile_w:(j + 1) * tile_w]
+             for j in range(4)] for i in range(4)]
+
+
+def is_blank(thresh):
+    """True if the middle of a thresholded tile is (almost) one flat colour."""
+    dy = int(thresh.shape[0] * BLANK_MARGIN)
+    dx = int(thresh.shape[1] * BLANK_MARGIN)
+    middle = thresh[dy:thresh.shape[0] - dy, dx:thresh.shape[1] - dx]
+    ink = np.count_nonzero(middle) / middle.size
+    return min(ink, 1.0 - ink) < BLANK_INK
+
+
+def _parse_number(text):
+    text = text.strip()
+    return int(text) if text.isdigit() else None
+
+
+class TesseractBoardReader:
+    """Reads the raw number on each tile with as few Tesseract runs as possible.
+
+    read() returns a 4x4 list of ints, with None where no number was found,
+    so callers can keep post-processing (e.g. closest_valid_tile) as before.
+    """
+
+    def __init__(self, threshold=180, mode='batch', workers=4, cache_size=4096, dump_dir=None):
+        if mode not in ('batch', 'threads'):
+            raise ValueError(f"Unknown OCR mode: {mode}")
+        self.threshold = threshold
+        self.mode = mode
+        self.cache_size = cache_size
+        self.dump_dir = dump_dir
+        self._cache = OrderedDict()
+        self._pool = ThreadPoolExecutor(max_workers=workers) if mode == 'threads' else None
+        self.hits = 0
+        self.misses = 0
+
+    def preprocess(self, tile):
+        gray = cv2.cvtColor(tile, cv2.COLOR_BGR2GRAY)
+        _, thresh = cv2.threshold(gray, self.threshold, 255, cv2.THRESH_BINARY_INV)
+        return thresh
+
+    def _key(self, thresh):
+        digest = hashlib.blake2b(thresh.tobytes(), digest_size=16)
+        digest.update(str(thresh.shape).encode())
+        return digest.digest()
+
+    def _remember(self, key, value):
+        self._cache[key] = value
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _ocr_one(self, thresh):
+        return _parse_number(pytesseract.image_to_string(thresh, config='--psm 10 digits'))
+
+    def _ocr_stacked(self, tiles):
+        """Reads several tiles with one Tesseract call on a vertical stack."""
+        width = max(t.shape[1] for t in tiles)
+        slot_h = max(t.shape[0] for t in tiles) + STACK_PADDING
+        stack = np.full((slot_h * len(tiles), width), 255, dtype=np.uint8)
+        for k, tile in enumerate(tiles):
+            border = np.concatenate([tile[0], tile[-1], tile[:, 0], tile[:, -1]])
+            if border.mean() < 128:
+                tile = 255 - tile  # Normalize every tile to dark text on white
+            stack[k * slot_h:k * slot_h + tile.shape[0], :tile.shape[1]] = tile
+
+        data = pytesseract.image_to_data(stack, config='--psm 6 digits',
+                                         output_type=pytesseract.Output.DICT)
+        texts = [''] * len(tiles)
+        for text, top, height in zip(data['text'], data['top'], data['height']):
+            if not text.strip():
+                continue
+            slot = min(len(tiles) - 1, (top + height // 2) // slot_h)
+            texts[slot] += text.strip()
+        return [_parse_number(text) for text in texts]
+
+    def read(self, board_img):
+        tiles = split_tiles(board_img)
+        results = [[None] * 4 for _ in range(4)]
+        pending = []
+
+        for i in range(4):
+            for j in range(4):
+                thresh = self.preprocess(tiles[i][j])
+                if self.dump_dir:
+                    cv2.imwrite(os.path.join(self.dump_dir, f"tile_{i}_{j}.png"), tiles[i][j])
+                key = self._key(thresh)
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                    results[i][j] = self._cache[key]
+                    self.hits += 1
+                else:
+                    self.misses += 1
+                    if is_blank(thresh):
+                        self._remember(key, None)
+                    else:
+                        pending.append((i, j, key, thresh))
+
+        if pending:
+            images = [thresh for _, _, _, thresh in pending]
+            if self.mode == 'batch':
+                numbers = self._ocr_stacked(images)
+                # None of these tiles is empty, so a tile the stacked read
+                # missed is a misread; only a single-tile read is trusted
+                numbers = [self._ocr_one(thresh) if number is None else number
+                           for thresh, number in zip(images, numbers)]
+            else:
+                numbers = list(self._pool.map(self._ocr_one, images))
+            for (i, j, key, _), number in zip(pending, numbers):
+                results[i][j] = number
+                self._remember(key, number)
+
+        return results
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
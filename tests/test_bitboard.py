@@ -0,0 +1,27 @@
+import random
+
+import numpy as np
+
+from ai2048.engine import game_logic
+from ai2048.engine.bitboard import (MOVES, MOVE_FUNCTIONS, board_to_bitboard, bitboard_to_board, execute_move,
+                                    all_moves)
+
+TILES = [0, 0, 0, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048, 4096]
+
+
+def random_boards(count, seed=0):
+    rng = random.Random(seed)
+    return [np.array([[rng.choice(TILES) for _ in range(4)] for _ in range(4)]) for _ in range(count)]
+
+
+def test_moves_match_game_logic():
+    for board in random_boards(2000):
+        bb = board_to_bitboard(board)
+        legal = dict(all_moves(bb))
+        for move in MOVES:
+            expected, expected_score = getattr(game_logic, f"move_{move}")(board)
+            moved, score = execute_move(bb, move)
+            assert bitboard_to_board(moved).tolist() == expected.tolist()
+            assert score == expected_score
+            assert MOVE_FUNCTIONS[move](bb) == moved
+            assert legal.get(move, bb) == moved
@@ -0,0 +1,37 @@
+import numpy as np
+
+from ai2048.device.game_trace import TraceReader, TraceWriter, decode_roi
+
+
+def turns(count):
+    rng = np.random.default_rng(0)
+    for i in range(count):
+        bb = int(rng.integers(0, 1 << 63))
+        stats = {'depth': i % 7, 'nodes': i * 10, 'leaves': i * 3, 'value': float(i) / 4,
+                 'book': i % 5 == 0, 'partial': i % 3 == 0}
+        timings = {'capture': 1.5, 'recognize': 0.25, 'search': float(i), 'swipe': 2.0}
+        roi = rng.integers(0, 256, size=(8, 6, 3), dtype=np.uint8) if i % 2 else None
+        yield bb, ('up', 'down', 'left', 'right', None)[i % 5], stats, timings, roi
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / 'game.trace')
+    expected = list(turns(70))
+    # Two sessions with small chunks: continuing a trace and reading across chunks
+    for part in (expected[:45], expected[45:]):
+        with TraceWriter(path, chunk_records=16) as writer:
+            for bb, move, stats, timings, roi in part:
+                writer.record(bb, move, stats, timings, roi)
+
+    with TraceReader(path) as reader:
+        assert len(reader) == len(expected)
+        for record, (bb, move, stats, timings, roi) in zip(reader, expected):
+            assert (record.board, record.move, record.depth) == (bb, move, stats['depth'])
+            assert (record.book, record.partial) == (stats['book'], stats['partial'])
+            assert (record.nodes, record.leaves, record.value) == (stats['nodes'], stats['leaves'], stats['value'])
+            assert record.search_ms == timings['search']
+            if roi is None:
+                assert record.roi is None
+            else:
+                assert np.array_equal(decode_roi(record.roi), roi)
+        assert reader[57].index == 57
@@ -0,0 +1,25 @@
+import random
+
+import numpy as np
+
+from ai2048.solver import heuristic
+
+
+def random_bitboards(count, seed=0):
+    rng = random.Random(seed)
+    return [sum(rng.choice([0, 0, 1, 2, 3, 5, 8, 11]) << (4 * i) for i in range(16)) for _ in range(count)]
+
+
+def test_batched_matches_scalar():
+    bbs = random_bitboards(500)
+    batched = heuristic.evaluate_boards(np.array(bbs, dtype=np.uint64))
+    assert batched.tolist() == [heuristic.evaluate_board(bb) for bb in bbs]
+
+
+def test_weights_changed_in_place_select_a_new_table():
+    weights = dict(heuristic.HEURISTIC_WEIGHTS)
+    bb = random_bitboards(1)[0]
+    before = heuristic.evaluate_board(bb, weights)
+    weights['empty'] += 1000.0
+    assert heuristic.evaluate_board(bb, weights) == heuristic.evaluate_board(bb, dict(weights))
+    assert heuristic.evaluate_board(bb, weights) != before
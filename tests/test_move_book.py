@@ -0,0 +1,34 @@
+import random
+
+import numpy as np
+
+from ai2048.engine.bitboard import canonical_board, spawn_random_tile, symmetries, execute_move
+from ai2048.solver import ai_solver
+from ai2048.solver.move_book import MoveBook, write_book
+
+DEPTH = 2
+
+
+def test_lookup_agrees_across_symmetries(tmp_path):
+    rng = random.Random(0)
+    bb = spawn_random_tile(spawn_random_tile(0, rng), rng)
+    entries = {}
+    for _ in range(20):
+        canon = canonical_board(bb)
+        scores = ai_solver.score_moves(canon, DEPTH)
+        move = max(scores, key=scores.get)
+        entries[canon] = (move, scores[move], DEPTH)
+        bb = spawn_random_tile(execute_move(bb, move)[0], rng)
+    path = str(tmp_path / 'positions.book')
+    write_book(path, entries)
+
+    with MoveBook(path) as book:
+        for canon, (_, value, _) in entries.items():
+            for variant in symmetries(canon):
+                move, book_value = book.lookup(variant)
+                scores = ai_solver.score_moves(variant, DEPTH)
+                assert book_value == float(np.float32(value))
+                # Symmetric variants may sum in another order: accept a tied best move
+                best = max(scores.values())
+                assert abs(scores[move] - best) <= 1e-9 * best
+        assert book.lookup(0xF) is None  # A lone 32768 tile never came up
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip('cv2')
+ocr_recognition = pytest.importorskip('ai2048.vision.ocr_recognition')
+
+TILE = 60
+NUMBERED = {(0, 0): '2', (3, 3): '16'}
+
+
+def board_image():
+    """Light empty tiles in darker grid gaps, with digits drawn on two of them."""
+    board = np.full((4 * TILE, 4 * TILE, 3), (180, 193, 205), dtype=np.uint8)
+    for k in range(4):
+        board[k * TILE:k * TILE + 3, :] = board[k * TILE + TILE - 3:(k + 1) * TILE, :] = (160, 173, 187)
+        board[:, k * TILE:k * TILE + 3] = board[:, k * TILE + TILE - 3:(k + 1) * TILE] = (160, 173, 187)
+    for (i, j), text in NUMBERED.items():
+        cv2.putText(board, text, (j * TILE + 10, i * TILE + 42), cv2.FONT_HERSHEY_SIMPLEX,
+                    1.2, (50, 60, 70), 3)
+    return board
+
+
+class CountingOcr:
+    """Stands in for Tesseract and records which tiles reached it."""
+
+    def __init__(self, stacked, one):
+        self.stacked, self.one = stacked, one
+        self.stacked_calls, self.one_calls = [], []
+
+    def ocr_stacked(self, tiles):
+        self.stacked_calls.append(len(tiles))
+        return list(self.stacked[:len(tiles)])
+
+    def ocr_one(self, thresh):
+        self.one_calls.append(thresh.shape)
+        return self.one
+
+
+def test_blank_tiles_detected():
+    reader = ocr_recognition.TesseractBoardReader()
+    tiles = ocr_recognition.split_tiles(board_image())
+    blank = [[ocr_recognition.is_blank(reader.preprocess(tile)) for tile in row] for row in tiles]
+    assert blank == [[(i, j) not in NUMBERED for j in range(4)] for i in range(4)]
+
+
+def test_batch_reads_only_numbered_tiles_in_one_call(monkeypatch):
+    reader = ocr_recognition.TesseractBoardReader(mode='batch')
+    fake = CountingOcr(stacked=[2, None], one=16)
+    monkeypatch.setattr(reader, '_ocr_stacked', fake.ocr_stacked)
+    monkeypatch.setattr(reader, '_ocr_one', fake.ocr_one)
+
+    expected = [[None] * 4 for _ in range(4)]
+    expected[0][0], expected[3][3] = 2, 16
+    assert reader.read(board_image()) == expected
+    # One stacked call for the two numbered tiles, one re-read for the miss
+    assert fake.stacked_calls == [2]
+    assert len(fake.one_calls) == 1
+
+    assert reader.read(board_image()) == expected
+    assert fake.stacked_calls == [2] and len(fake.one_calls) == 1
+
+
+def test_threads_read_only_numbered_tiles(monkeypatch):
+    reader = ocr_recognition.TesseractBoardReader(mode='threads', workers=2)
+    fake = CountingOcr(stacked=[], one=8)
+    monkeypatch.setattr(reader, '_ocr_one', fake.ocr_one)
+    try:
+        results = reader.read(board_image())
+    finally:
+        reader.close()
+    assert [(i, j) for i in range(4) for j in range(4) if results[i][j] is not None] == sorted(NUMBERED)
+    assert len(fake.one_calls) == len(NUMBERED)
@@ -0,0 +1,33 @@
+import random
+
+import pytest
+
+from ai2048.engine.bitboard import spawn_random_tile, execute_move
+from ai2048.solver import ai_solver
+
+
+@pytest.fixture(scope='module', autouse=True)
+def pool():
+    yield
+    ai_solver.shutdown_executor()
+
+
+def positions(count, seed=0):
+    rng = random.Random(seed)
+    boards = []
+    bb = spawn_random_tile(spawn_random_tile(0, rng), rng)
+    while len(boards) < count:
+        move = ai_solver.best_move(bb, depth=1, workers=1)
+        if move is None:
+            break
+        bb = spawn_random_tile(execute_move(bb, move)[0], rng)
+        boards.append(bb)
+    return boards[::4]
+
+
+@pytest.mark.parametrize('split', ['chance', 'moves'])
+def test_parallel_matches_serial(split):
+    for bb in positions(40):
+        ai_solver.TRANSPOSITION_TABLE.clear()
+        serial = ai_solver.score_moves(bb, 3)
+        assert ai_solver.score_moves_parallel(bb, 3, workers=2, split=split) == serial